@@ -1,28 +1,63 @@
 import numpy as np
+from Colony import deposit
+from Sampling import pick_one
 import xml.dom.minidom as xml
 
 class Ants:
-    def __init__(self, starting_position=0):
+    def __init__(self, starting_position=0, colony=None, index=None):
         """ Construtor for Ants
 
+        Ants bound to a Colony are thin views of its row index, their path lives in the colony's tour matrix.
+
         Args:
             starting_position: Ants starting position. Defaults to 0.
+            colony: Colony whose state arrays hold this ant's path. Defaults to None (the ant keeps its own list).
+            index: Row of this ant in the colony. Defaults to None.
         """
         # Start position saved for ant resetting
         self.start_pos = starting_position
         self.current_pos = starting_position
-        self.found_path = []
+        self.colony = colony
+        self.index = index
+        self._found_path = []
+
+
+    @property
+    def found_path(self):
+        """ Visited nodes ending back at the starting position
+        """
+        if self.colony is not None:
+            return self.colony.paths[self.index, 1:]
+        return self._found_path
+
 
+    @found_path.setter
+    def found_path(self, path):
+        if self.colony is not None:
+            self.colony.paths[self.index, 1:] = path
+        else:
+            self._found_path = path
 
-    def find_path(self, pheramones, visibility):
+
+    def find_path(self, pheramones, visibility, alpha=2, beta=1, rng=None):
         """ Finds path for the ant based on pheramones and visibility
 
         Args:
             pheramones: Adjacency matrix representing graph pheramones
             visibility: Adjacency matrix representing graph visibility
+            alpha: Exponent applied to pheramones. Defaults to 2.
+            beta: Exponent applied to visibilities. Defaults to 1.
+            rng: numpy Generator to draw from. Defaults to None (the legacy global np.random stream).
         """
         # Dupe visibility graph to manipulate without affecting other ants during the same epoch
         temp_vis = np.array(visibility)
+        found_path = []
+        
+        # RNG for finding the next node to travel to, drawn for every step at once
+        if rng is None:
+            rands = np.random.random_sample(len(temp_vis) - 1)
+        else:
+            rands = rng.random(len(temp_vis) - 1)
         
         # Loop for number of cities times
         for n in range(0, len(temp_vis)-1):
@@ -34,38 +69,41 @@ class Ants:
             pher_paths = np.array(pheramones[self.current_pos])
             
             # Heuristic to make higher pheramones exponentially more attractive
-            pher_paths = np.power(pher_paths, 2)
+            pher_paths = np.power(pher_paths, alpha)
             
             # All possible path to travel to from current node and their visibilities 
-            vis_paths = np.array(temp_vis[self.current_pos]) 
+            vis_paths = np.power(temp_vis[self.current_pos], beta)
             
             # Combining both visibilities and phermones by multiplying each pher by
             combined_paths = np.multiply(pher_paths,vis_paths) 
             
-            # Finding the cumulative probability of each node
-            total = sum(combined_paths)
-            prob_paths = combined_paths/total
-            prob_paths = np.cumsum(prob_paths)
-            
-            # RNG for finding the next node to travel to
-            rand = np.random.random_sample()
-            
-            # Getting 0,0 of the non zero list eliminates the chances of choosing past visited nodes
-            next_node = np.nonzero(prob_paths>rand)[0][0]
+            # Binary search over the cumulative weights, past visited nodes add no weight so they are never chosen
+            next_node = pick_one(combined_paths, rands[n])
             
             # print(prob_paths)
             # print(rand)
             # print(next_node)
             
             # Adding next node to found path
-            self.found_path.append(next_node)
+            found_path.append(next_node)
             self.current_pos = next_node
             
         # Last node to travel to complete cycle
-        self.found_path.append(self.start_pos)
+        found_path.append(self.start_pos)
+        self.found_path = found_path
         self.current_pos = self.start_pos
         
         
+    def set_path(self, path):
+        """ Stores a path built elsewhere (e.g. by the batched Colony engine)
+
+        Args:
+            path: Array of visited nodes ending back at the starting position
+        """
+        self.found_path = path if self.colony is not None else list(path)
+        self.current_pos = self.start_pos
+
+
     def eval_cost(self, distances):
         """ Evaluate total cost of the stored path from ant
 
@@ -96,19 +134,12 @@ class Ants:
             temp_pher: Returns updated adjacency matrix of pheramones
         """
         # Dupes pheramones graph to avoid deadlock
+        # Solvers deposit straight into their matrix with Colony.deposit instead
         temp_pher = np.array(pheramones)
         
-        # Pheramone to drop off along path
+        # Pheramone to drop off along path, mirrored for data consistency
         pher_dropoff = Q/self.eval_cost(distances)
-        
-        # Loop through the found path 
-        prev_node = self.start_pos
-        for n in self.found_path:
-            # Mirrored for data consistency
-            temp_pher[prev_node][n] = temp_pher[prev_node][n] + pher_dropoff
-            temp_pher[n][prev_node] = temp_pher[n][prev_node] + pher_dropoff
-
-            prev_node = n
+        deposit(temp_pher, [self.found_path], [self.start_pos], [pher_dropoff])
         
         return temp_pher
                 
@@ -117,7 +148,9 @@ class Ants:
         """ Resets Ant
         """
         self.current_pos = self.start_pos
-        self.found_path = []
+        # Bound ants are simply overwritten by the next construction, nothing is reallocated
+        if self.colony is None:
+            self.found_path = []
         
         
     def __str__(self):
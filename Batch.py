@@ -0,0 +1,183 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ACO_TSP import ACO_TSP
+from EAS_TSP import EAS_TSP
+from MMAS_TSP import MMAS_TSP
+from Stopping import TourAgreement, Stagnation, TimeBudget
+from Sweep import run_point, write_table
+import argparse
+import ast
+import glob
+import os
+
+# Solver variants by their command line name
+SOLVERS = {"aco": ACO_TSP, "eas": EAS_TSP, "mmas": MMAS_TSP}
+
+
+def expand_instances(patterns):
+    """ Instance files named by paths and glob patterns, in the order given and without repeats
+
+    Args:
+        patterns: List of file paths or glob patterns, e.g. "./TSPLIB_XML/*.xml"
+
+    Returns:
+        instances: List of file paths, patterns expanded in sorted order
+    """
+    instances = []
+    for pattern in patterns:
+        instances.extend(sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern])
+    return list(dict.fromkeys(instances))
+
+
+def parse_parameter(text):
+    """ Splits a NAME=VALUE command line parameter, the value read as a Python literal where it is one
+
+    Args:
+        text: Parameter as typed, e.g. "max_epoch=100" or "local_search=best"
+
+    Returns:
+        name, value: The parameter name and its parsed value, plain strings are kept as they are
+    """
+    name, separator, value = text.partition("=")
+    if not separator or not name.strip():
+        raise ValueError("Parameters are given as NAME=VALUE, got " + text)
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return name.strip(), value
+
+
+def solve_task(solver_class, graph_path, seed, params, solver_kwargs, keep_path):
+    """ Solves one instance with one solver and seed, failures are recorded rather than ending the batch
+
+    Args:
+        solver_class: ACO_TSP, EAS_TSP or MMAS_TSP
+        graph_path: Path of the instance
+        seed: Seed for random and np.random
+        params: Dict of solver parameters, ones the solver does not take are ignored
+        solver_kwargs: Keyword arguments every solver takes, e.g. stopping
+        keep_path: Also record the best tour found
+
+    Returns:
+        row: Dict describing the run and its result, or its error
+    """
+    try:
+        row = run_point(solver_class, graph_path, params, seed, solver_kwargs, keep_path)
+    except Exception as error:
+        return {"solver": solver_class.__name__, "graph": graph_path, "seed": seed,
+                "error": type(error).__name__ + ": " + str(error)}
+    # Parameters beyond the sweepable ones (e.g. candidate_size) are recorded as well
+    accepted = solver_class.accepted_parameters()
+    row.update({name: value for name, value in params.items() if name in accepted and name not in row})
+    row["error"] = None
+    return row
+
+
+def run_batch(solver_classes, instances, seeds=(1,), output_path="results.csv", processes=1, params=None,
+              keep_paths=False, **solver_kwargs):
+    """ Solves every instance with every solver and seed within one long-lived process, or a pool of them
+
+    Instances are parsed once into the binary cache, so repeated solves of an instance skip parsing.
+    A progress line is printed as every solve finishes.
+
+    Args:
+        solver_classes: List of solver classes, e.g. [ACO_TSP, MMAS_TSP]
+        instances: List of instance paths
+        seeds: Seeds every instance is solved with. Defaults to (1,).
+        output_path: CSV, JSON, JSON lines or Parquet file the results are written to. Defaults to "results.csv".
+        processes: Number of worker processes, 1 solves everything in this process and None uses every CPU.
+            Defaults to 1.
+        params: Dict of solver parameters, ones a solver does not take are ignored for it. Defaults to None.
+        keep_paths: Also record every run's best tour. Defaults to False.
+        **solver_kwargs: Keyword arguments every solver takes, e.g. stopping
+
+    Returns:
+        rows: List of result dicts in instance, solver, seed order, also written to output_path
+    """
+    params = params or {}
+    tasks = [(solver_class, instance, seed) for instance in instances for solver_class in solver_classes
+             for seed in seeds]
+    rows = [None] * len(tasks)
+
+    def report(row):
+        done = sum(entry is not None for entry in rows)
+        outcome = row["error"] if row["error"] is not None else str(row["best_dis"]) + " in " + "%.2fs" % row["seconds"]
+        print("[" + str(done) + "/" + str(len(tasks)) + "] " + row["graph"] + " " + row["solver"] + " seed "
+              + str(row["seed"]) + ": " + outcome)
+
+    if processes == 1:
+        for index, (solver_class, instance, seed) in enumerate(tasks):
+            rows[index] = solve_task(solver_class, instance, seed, params, solver_kwargs, keep_paths)
+            report(rows[index])
+    else:
+        # Workers live for the whole batch, each paying interpreter and NumPy startup once
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {pool.submit(solve_task, solver_class, instance, seed, params, solver_kwargs, keep_paths): index
+                       for index, (solver_class, instance, seed) in enumerate(tasks)}
+            for future in as_completed(futures):
+                rows[futures[future]] = future.result()
+                report(rows[futures[future]])
+
+    write_table(rows, output_path)
+    return rows
+
+
+def main(argv=None):
+    """ Command line entry point, see --help
+
+    Args:
+        argv: Arguments to parse. Defaults to None (sys.argv).
+
+    Returns:
+        rows: List of result dicts
+    """
+    parser = argparse.ArgumentParser(description="Solve TSPLIB instances in batch with ACO solvers.")
+    parser.add_argument("instances", nargs="+", help="Instance files or glob patterns, XML exports or .tsp files")
+    parser.add_argument("-s", "--solver", nargs="+", choices=list(SOLVERS), default=["aco"],
+                        help="Solver variants to run (default: aco)")
+    parser.add_argument("-p", "--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Solver parameter, e.g. -p max_epoch=100 -p candidate_size=20, repeatable")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[1], help="Seeds every instance is solved with")
+    parser.add_argument("-o", "--output", default="results.csv",
+                        help="Results file, .csv, .json, .jsonl or .parquet (default: results.csv)")
+    parser.add_argument("-j", "--processes", type=int, default=1,
+                        help="Worker processes, 1 solves in this process and 0 uses every CPU (default: 1)")
+    parser.add_argument("--time-budget", type=float, help="Stop each run after this many seconds")
+    parser.add_argument("--stagnation", type=int, help="Stop each run after this many epochs without improvement")
+    parser.add_argument("--paths", action="store_true", help="Record each run's best tour")
+    args = parser.parse_args(argv)
+
+    instances = expand_instances(args.instances)
+    missing = [instance for instance in instances if not os.path.isfile(instance)]
+    if missing:
+        parser.error("no such instance file: " + ", ".join(missing))
+    if not instances:
+        parser.error("no instance files matched")
+
+    solver_classes = [SOLVERS[name] for name in dict.fromkeys(args.solver)]
+    params = {}
+    for text in args.param:
+        try:
+            name, value = parse_parameter(text)
+        except ValueError as error:
+            parser.error(str(error))
+        if not any(name in solver_class.accepted_parameters() for solver_class in solver_classes):
+            parser.error("no chosen solver takes the parameter " + name)
+        params[name] = value
+
+    solver_kwargs = {}
+    if args.time_budget is not None or args.stagnation is not None:
+        # Extra criteria end runs early, colonies that agree on a tour still stop as usual
+        stopping = [TourAgreement()]
+        if args.time_budget is not None:
+            stopping.append(TimeBudget(args.time_budget))
+        if args.stagnation is not None:
+            stopping.append(Stagnation(args.stagnation))
+        solver_kwargs["stopping"] = stopping
+
+    return run_batch(solver_classes, instances, seeds=args.seeds, output_path=args.output,
+                     processes=args.processes or None, params=params, keep_paths=args.paths, **solver_kwargs)
+
+
+if __name__ == "__main__":
+    main()
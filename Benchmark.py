@@ -0,0 +1,219 @@
+from concurrent.futures import ProcessPoolExecutor
+from TSPLIB import CoordinateDistances, euc_2d
+import numpy as np
+import multiprocessing as mp
+import json
+import platform
+import random
+import resource
+import time
+
+# Known optimal tour lengths
+OPTIMA = {
+    "burma14": 3323,
+    "brazil58": 25395,
+}
+
+# Instances every solver is benchmarked on, generated ones are uniform random EUC_2D graphs
+BENCHMARK_CASES = [
+    {"instance": "burma14", "graph_path": "./TSPLIB_XML/burma14.xml", "max_epoch": 300},
+    {"instance": "brazil58", "graph_path": "./TSPLIB_XML/brazil58.xml", "max_epoch": 300},
+    {"instance": "random200", "cities": 200, "max_epoch": 50},
+    {"instance": "random1000", "cities": 1000, "max_epoch": 10, "candidate_size": 20},
+]
+
+
+def random_graph(cities, seed=0):
+    """ Uniform random EUC_2D graph
+
+    Args:
+        cities: Number of cities
+        seed: Seed of the coordinates. Defaults to 0.
+
+    Returns:
+        adj_matrix: NumPy adjacency matrix representing the graph
+    """
+    coords = np.random.default_rng(seed).uniform(0, 10000, size=(cities, 2))
+    return np.array(CoordinateDistances(coords, euc_2d))
+
+
+def time_phases(solver):
+    """ Wraps the steps of the solver's epochs so each one accumulates its own wall-clock time
+
+    Args:
+        solver: Solver about to be benchmarked
+
+    Returns:
+        seconds: Dict of phase to accumulated seconds, filled in as epochs run
+    """
+    phases = {
+        "choice_info_seconds": [(solver.colony, "update_choice_info")],
+        "construction_seconds": [(solver.colony, "construct")],
+        "evaluation_seconds": [(solver.colony, "evaluate")],
+        "local_search_seconds": [(solver, "improve_tours")],
+        # Best tour tracking and the stopping criteria
+        "best_seconds": [(solver, "update_best")],
+        "update_seconds": [(solver, "update_pheramones"), (solver, "decay_pheramones")],
+    }
+    seconds = dict.fromkeys(phases, 0.0)
+
+    def timed(method, phase):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            seconds[phase] += time.perf_counter() - start
+            return result
+        return wrapper
+
+    for phase, methods in phases.items():
+        for owner, name in methods:
+            setattr(owner, name, timed(getattr(owner, name), phase))
+    return seconds
+
+
+def benchmark_case(solver_class, case, seed):
+    """ Benchmarks one solver on one instance, run in a fresh process so peak RSS belongs to this case alone
+
+    Args:
+        solver_class: ACO_TSP, EAS_TSP or MMAS_TSP
+        case: Entry of BENCHMARK_CASES
+        seed: Seed for random and np.random
+
+    Returns:
+        result: Dict of timings, memory and solution quality
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    np.seterr(divide='ignore')
+
+    kwargs = {"max_epoch": case["max_epoch"], "cache_dir": None}
+    if "candidate_size" in case:
+        kwargs["candidate_size"] = case["candidate_size"]
+    if "cities" in case:
+        kwargs["distances"] = random_graph(case["cities"])
+        kwargs["graph_path"] = case["instance"]
+    else:
+        kwargs["graph_path"] = case["graph_path"]
+
+    start = time.perf_counter()
+    solver = solver_class(**kwargs)
+    load_seconds = time.perf_counter() - start
+
+    # Each step of an epoch is timed on its own, so construction and update figures hold nothing else
+    phase_seconds = time_phases(solver)
+
+    epoch_seconds = []
+    converged_at = solver.max_epoch
+    for n in range(0, solver.max_epoch):
+        epoch_start = time.perf_counter()
+        is_converged = solver.epoch()
+        epoch_seconds.append(time.perf_counter() - epoch_start)
+        if is_converged:
+            converged_at = n
+            break
+
+    optimum = OPTIMA.get(case["instance"])
+    best_dis = float(solver.current_best_dis)
+    return {
+        "solver": solver_class.__name__,
+        "instance": case["instance"],
+        "cities": len(solver.distances),
+        "num_ants": solver.num_ants,
+        "seed": seed,
+        "load_seconds": load_seconds,
+        "epochs": len(epoch_seconds),
+        "converged_at": converged_at,
+        "stopped_by": solver.stopped_by,
+        "total_seconds": sum(epoch_seconds),
+        "mean_epoch_seconds": float(np.mean(epoch_seconds)),
+        "epoch_seconds": epoch_seconds,
+        **phase_seconds,
+        # Linux reports ru_maxrss in KiB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "best_dis": best_dis,
+        "optimum": optimum,
+        "gap": None if optimum is None else (best_dis - optimum) / optimum,
+    }
+
+
+def run_benchmark(solver_classes, cases=BENCHMARK_CASES, seeds=(1,), output_path="benchmark.json"):
+    """ Runs every solver on every case and stores the results as JSON
+
+    Cases run one after another, each in its own freshly spawned process, so timings do not compete for cores.
+
+    Args:
+        solver_classes: List of solver classes
+        cases: List of benchmark cases. Defaults to BENCHMARK_CASES.
+        seeds: Seeds run for every case. Defaults to (1,).
+        output_path: JSON file the results are written to. Defaults to "benchmark.json".
+
+    Returns:
+        report: Dict with the environment and one result per solver, case and seed
+    """
+    results = []
+    for solver_class in solver_classes:
+        for case in cases:
+            for seed in seeds:
+                with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+                    result = pool.submit(benchmark_case, solver_class, case, seed).result()
+                print(result["solver"] + " on " + result["instance"] + ": " + str(result["best_dis"])
+                      + " in " + str(round(result["total_seconds"], 3)) + "s")
+                results.append(result)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "results": results,
+    }
+    with open(output_path, "w") as file:
+        json.dump(report, file, indent=2)
+    return report
+
+
+def compare(baseline_path, report, tolerance=0.1):
+    """ Finds regressions of a benchmark report against a stored baseline
+
+    Args:
+        baseline_path: JSON file written by run_benchmark
+        report: Report returned by run_benchmark
+        tolerance: Allowed relative slowdown or memory growth. Defaults to 0.1.
+
+    Returns:
+        regressions: List of human readable regressions, empty if there are none
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    key = lambda result: (result["solver"], result["instance"], result["seed"])
+    previous = {key(result): result for result in baseline["results"]}
+
+    regressions = []
+    for result in report["results"]:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        name = "/".join(str(part) for part in key(result))
+        for metric in ("mean_epoch_seconds", "choice_info_seconds", "construction_seconds", "evaluation_seconds",
+                       "local_search_seconds", "best_seconds", "update_seconds", "peak_rss_mb"):
+            # Baselines recorded before a metric existed have nothing to compare it with
+            if metric in old and result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(name + " " + metric + ": " + str(old[metric]) + " -> " + str(result[metric]))
+        # Fixed seeds make solution quality exactly reproducible, any change is worth a look
+        if result["best_dis"] > old["best_dis"]:
+            regressions.append(name + " best_dis: " + str(old["best_dis"]) + " -> " + str(result["best_dis"]))
+    return regressions
+
+
+if __name__ == "__main__":
+    from ACO_TSP import ACO_TSP
+    from EAS_TSP import EAS_TSP
+    from MMAS_TSP import MMAS_TSP
+    from os.path import isfile
+    baseline_path = "benchmark_baseline.json"
+    report = run_benchmark([ACO_TSP, EAS_TSP, MMAS_TSP])
+    if isfile(baseline_path):
+        for regression in compare(baseline_path, report):
+            print("REGRESSION " + regression)
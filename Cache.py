@@ -0,0 +1,137 @@
+import numpy as np
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+# Default location of compiled instances, relative to where the solver is run
+CACHE_DIR = "./.aco_cache"
+
+# Stale entries changed more recently than this may still be filled by another process and are left alone
+STALE_SECONDS = 600
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """ Content hash of a file, read in chunks so large instances never sit in memory whole
+
+    Args:
+        path: File path to hash
+        chunk_size: Bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        digest: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def array_name(name, precision="float64"):
+    """ Cache entry name of an array stored at a given floating point precision
+
+    Args:
+        name: Name of the array, e.g. "distances"
+        precision: "float64" or "float32". Defaults to "float64".
+
+    Returns:
+        name: Entry name, float64 entries keep the plain name
+    """
+    if precision == "float64":
+        return name
+    return name + "_" + precision
+
+
+class InstanceCache:
+    def __init__(self, source_path, cache_dir=CACHE_DIR):
+        """ Constructor for InstanceCache, binary copies of the arrays derived from one graph file
+
+        Entries are keyed on the source's real path and on its content hash, so editing the source invalidates
+        them while same-named files in other directories keep entries of their own.
+
+        Args:
+            source_path: Path of the graph file the cached arrays are derived from
+            cache_dir: Directory holding every cached instance, None disables caching. Defaults to CACHE_DIR.
+        """
+        self.cache_dir = cache_dir
+        real_path = os.path.realpath(source_path)
+        self.prefix = (os.path.basename(source_path) + "-"
+                       + hashlib.sha256(real_path.encode("utf-8")).hexdigest()[:16] + "-")
+        self.path = None
+        if cache_dir is not None:
+            self.path = os.path.join(cache_dir, self.prefix + file_hash(source_path))
+
+
+    def fetch(self, name, build):
+        """ Memory-maps a cached array, building and storing it first on a miss
+
+        Args:
+            name: Name of the array within the instance, e.g. "distances"
+            build: Zero argument function computing the array
+
+        Returns:
+            array: Read-only memory-mapped NumPy array, or whatever build returned if it is not an ndarray
+        """
+        if self.path is None:
+            return build()
+
+        array_path = os.path.join(self.path, name + ".npy")
+        if os.path.isfile(array_path):
+            return self.load(array_path)
+
+        array = build()
+        # Lazily computed graphs are cheap to rebuild and have nothing to store
+        if not isinstance(array, np.ndarray):
+            return array
+
+        self.clear_stale()
+        os.makedirs(self.path, exist_ok=True)
+        # Written under a temporary name unique to this writer, so a crashed run never leaves a truncated entry
+        # behind and processes filling a cold cache together never move or read each other's half-written files
+        handle, temp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=self.path)
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.save(file, array)
+            if not os.path.isfile(array_path):
+                os.replace(temp_path, array_path)
+        finally:
+            # Left over when another process stored the same entry first, which is then used like a hit
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return self.load(array_path)
+
+
+    def load(self, array_path):
+        """ Memory-maps a stored array without copying it
+
+        Args:
+            array_path: Path of the .npy file
+
+        Returns:
+            array: Read-only ndarray view of the mapping, avoiding np.memmap overhead on every indexing
+        """
+        return np.asarray(np.load(array_path, mmap_mode="r"))
+
+
+    def clear_stale(self):
+        """ Removes entries compiled from previous contents of the same source file
+
+        Entries still being written (holding temporary files) or changed within STALE_SECONDS are skipped,
+        another process may be filling them. Ones already memory-mapped stay readable once removed.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.listdir(self.cache_dir):
+            entry_path = os.path.join(self.cache_dir, entry)
+            if not entry.startswith(self.prefix) or entry_path == self.path:
+                continue
+            try:
+                recent = time.time() - os.path.getmtime(entry_path) < STALE_SECONDS
+                writing = any(name.endswith(".tmp") for name in os.listdir(entry_path))
+            except OSError:
+                # Removed by another process meanwhile
+                continue
+            if not recent and not writing:
+                shutil.rmtree(entry_path, ignore_errors=True)
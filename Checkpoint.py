@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import os
+import pickle
+
+def checkpoint_entries(arrays, state):
+    """ Entries of a checkpoint file: the arrays as they are plus the pickled state
+
+    Args:
+        arrays: Dict of NumPy arrays, e.g. the pheramones
+        state: Dict of everything else, pickled
+
+    Returns:
+        entries: Dict of NumPy arrays ready for write_checkpoint
+    """
+    entries = dict(arrays)
+    entries["state"] = np.frombuffer(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+    return entries
+
+
+def write_checkpoint(path, entries):
+    """ Writes checkpoint entries as a single .npz file
+
+    Args:
+        path: Path of the checkpoint
+        entries: Dict of NumPy arrays from checkpoint_entries
+    """
+    # Written under a temporary name so an interrupted write never replaces the previous checkpoint
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        np.savez(file, **entries)
+    os.replace(temp_path, path)
+
+
+def save_checkpoint(path, arrays, state):
+    """ Writes a checkpoint as a single .npz file: the arrays as they are plus the pickled state
+
+    Args:
+        path: Path of the checkpoint
+        arrays: Dict of NumPy arrays, e.g. the pheramones
+        state: Dict of everything else, pickled
+    """
+    write_checkpoint(path, checkpoint_entries(arrays, state))
+
+
+def load_checkpoint(path):
+    """ Reads a checkpoint written by save_checkpoint
+
+    Checkpoints hold pickled objects, only load ones you wrote yourself.
+
+    Args:
+        path: Path of the checkpoint
+
+    Returns:
+        arrays: Dict of NumPy arrays
+        state: Dict of everything else
+    """
+    with np.load(path) as entries:
+        arrays = {name: entries[name] for name in entries.files if name != "state"}
+        state = pickle.loads(entries["state"].tobytes())
+    return arrays, state
+
+
+class CheckpointWriter:
+    def __init__(self):
+        """ Constructor for CheckpointWriter, writes checkpoints on a background thread so epochs carry on meanwhile
+
+        At most one write is in flight, a new checkpoint first waits for the previous one to land.
+        """
+        self.executor = None
+        self.pending = None
+
+
+    def submit(self, path, arrays, state):
+        """ Queues a checkpoint, the arrays must be copies the solver no longer writes to
+
+        The state is pickled right away, it holds live objects (e.g. stopping criteria) the next epochs change.
+
+        Args:
+            path: Path of the checkpoint
+            arrays: Dict of NumPy arrays
+            state: Dict of everything else
+        """
+        entries = checkpoint_entries(arrays, state)
+        self.wait()
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        # Only the file write runs in the background
+        self.pending = self.executor.submit(write_checkpoint, path, entries)
+
+
+    def wait(self):
+        """ Blocks until the last queued checkpoint is on disk, raising any error the write ran into
+        """
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            pending.result()
@@ -0,0 +1,465 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from Symmetric import SymmetricMatrix
+from Sampling import Sampler
+from Kernels import resolve_backend
+import Kernels
+
+def nearest_neighbours(distances, k, block_size=1024):
+    """ Finds the k nearest neighbours of every city, used as candidate lists during construction
+
+    Args:
+        distances: Adjacency matrix representing graph distances
+        k: Number of neighbours to keep per city
+        block_size: Number of rows processed at once to bound temporary memory. Defaults to 1024.
+
+    Returns:
+        neighbours: (n x k) matrix of city indices, closest first
+    """
+    num_cities = len(distances)
+    k = min(k, num_cities - 1)
+    neighbours = np.empty((num_cities, k), dtype=np.int64)
+
+    for start in range(0, num_cities, block_size):
+        rows = np.arange(start, min(start + block_size, num_cities))
+        block = np.array(distances[rows], dtype=np.float64)
+        # A city is never its own neighbour
+        block[np.arange(len(rows)), rows] = np.inf
+
+        # Partition first so only the k closest get fully sorted
+        closest = np.argpartition(block, k - 1, axis=1)[:, :k]
+        order = np.argsort(np.take_along_axis(block, closest, axis=1), axis=1, kind="stable")
+        neighbours[rows] = np.take_along_axis(closest, order, axis=1)
+
+    return neighbours
+
+
+def tour_costs(distances, tours, start_positions):
+    """ Total cost of every tour at once by fancy-indexing the distance matrix
+
+    Args:
+        distances: Adjacency matrix representing graph distances
+        tours: (ants x n) matrix of tours in found_path order
+        start_positions: Array of starting cities, one per tour
+
+    Returns:
+        costs: Array of tour costs, one per tour
+    """
+    tours = np.asarray(tours)
+    prev_nodes = np.concatenate((np.asarray(start_positions)[:, None], tours[:, :-1]), axis=1)
+    return distances[prev_nodes, tours].sum(axis=1)
+
+
+def deposit(pheramones, tours, start_positions, amounts):
+    """ Deposits pheramones along every given tour in place with a single scatter-add, mirrored for symmetry
+
+    Args:
+        pheramones: Adjacency matrix representing graph pheramones, updated in place
+        tours: (ants x n) matrix of tours in found_path order
+        start_positions: Array of starting cities, one per tour
+        amounts: Pheramone dropped on every edge of each tour, one per tour
+    """
+    # Each tour's edges run from its start through every visited city
+    paths = np.concatenate((np.asarray(start_positions)[:, None], np.asarray(tours)), axis=1)
+    deposit_paths(pheramones, paths, amounts)
+
+
+def deposit_paths(pheramones, paths, amounts, backend="numpy"):
+    """ Deposits pheramones along closed paths in place with a single scatter-add, mirrored for symmetry
+
+    Args:
+        pheramones: Adjacency matrix (or SymmetricMatrix / SparsePheramones) representing graph pheramones, updated in place
+        paths: (ants x n+1) matrix of closed paths, starting and ending at the same city
+        amounts: Pheramone dropped on every edge of each path, one per path
+        backend: "numba" runs the compiled loop on full matrices. Defaults to "numpy".
+    """
+    if backend == "numba" and isinstance(pheramones, np.ndarray):
+        Kernels.deposit_paths(pheramones, np.asarray(paths), np.asarray(amounts, dtype=np.float64))
+        return
+
+    prev_nodes = paths[:, :-1].ravel()
+    next_nodes = paths[:, 1:].ravel()
+    dropoff = np.repeat(np.asarray(amounts, dtype=np.float64), paths.shape[1] - 1)
+
+    # Packed and sparse storage hold each edge once, so a single scatter covers both directions
+    if not isinstance(pheramones, np.ndarray):
+        pheramones.add_at(prev_nodes, next_nodes, dropoff)
+        return
+
+    # add.at accumulates edges shared by several ants instead of keeping only the last write
+    np.add.at(pheramones, (prev_nodes, next_nodes), dropoff)
+    np.add.at(pheramones, (next_nodes, prev_nodes), dropoff)
+
+
+def set_edges(pheramones, paths, values):
+    """ Assigns pheramones to every edge along closed paths, mirrored for symmetry
+
+    Args:
+        pheramones: Adjacency matrix (or SymmetricMatrix / SparsePheramones) representing graph pheramones
+        paths: (m x n+1) matrix of closed paths
+        values: (m x n) matrix of values, one per edge
+    """
+    prev_nodes = paths[:, :-1]
+    next_nodes = paths[:, 1:]
+    pheramones[prev_nodes, next_nodes] = values
+    # Packed and sparse storage share one cell per edge, where this is a harmless repeat
+    pheramones[next_nodes, prev_nodes] = values
+
+
+class Colony:
+    def __init__(self, num_cities, num_ants=0, alpha=2, beta=1, neighbours=None, sampler=None, backend="numpy",
+                 threads=1):
+        """ Constructor for Colony, the batched tour construction engine shared by every solver
+
+        The colony's state lives in preallocated arrays reused every epoch: an (ants x n+1) int32 matrix of
+        closed paths (start, the n-1 visited cities, start again), the start positions and the tour costs.
+
+        Args:
+            num_cities: Number of cities in the graph
+            num_ants: Number of ants the state arrays are allocated for. Defaults to 0.
+            alpha: Exponent applied to pheramones. Defaults to 2.
+            beta: Exponent applied to visibilities. Defaults to 1.
+            neighbours: Optional (n x k) candidate lists from nearest_neighbours. Defaults to None (all cities).
+            sampler: Sampler choosing each next city. Defaults to None (a new Sampler seeded from np.random).
+            backend: "numba" compiles construction and evaluation into per-ant loops run in parallel, giving the same
+                tours as "numpy" for the same seed. Falls back to "numpy" when Numba is not installed.
+                Defaults to "numpy".
+            threads: Number of blocks of ants built concurrently on a thread pool, each with its own random stream
+                spawned from sampler. Defaults to 1 (the whole colony at once on the calling thread).
+        """
+        if threads < 1:
+            raise ValueError("threads must be at least 1, got " + str(threads))
+        self.num_cities = num_cities
+        self.alpha = alpha
+        self.beta = beta
+        self.neighbours = neighbours
+        self.sampler = sampler or Sampler()
+        self.backend = resolve_backend(backend)
+        # Results depend on the thread count, never on how the pool schedules the blocks
+        self.samplers = [self.sampler]
+        self.executor = None
+        if threads > 1:
+            self.samplers = self.sampler.spawn(threads)
+            self.executor = ThreadPoolExecutor(max_workers=threads)
+
+        # pheramones**alpha * visibilities**beta, refreshed once per epoch
+        # In candidate mode only the (n x k) candidate entries are precomputed
+        self.choice_info = None
+        self.candidate_info = None
+        self.pheramones = None
+        self.visibilities = None
+        self.floor = None
+
+        # Closed paths whose pheramones changed since the choice info was built, None forces a full rebuild
+        self.changed_paths = None
+        # Sorted (city * n + candidate) keys and their flat positions in candidate_info, built on first use
+        self.candidate_keys = None
+        self.candidate_cells = None
+
+        self.allocate(num_ants)
+
+
+    def allocate(self, num_ants):
+        """ Allocates the colony state arrays, only needed when the number of ants changes
+
+        Args:
+            num_ants: Number of ants
+        """
+        self.num_ants = num_ants
+        self.paths = np.zeros((num_ants, self.num_cities + 1), dtype=np.int32)
+        self.start_positions = np.zeros(num_ants, dtype=np.int32)
+        self.costs = np.zeros(num_ants)
+        self.unvisited = np.empty((num_ants, self.num_cities), dtype=bool)
+
+
+    def set_starts(self, start_positions):
+        """ Places every ant on its starting city
+
+        Args:
+            start_positions: Array of starting cities, one per ant
+        """
+        if len(start_positions) != self.num_ants:
+            self.allocate(len(start_positions))
+        self.start_positions[:] = start_positions
+        # Starts never change so the first and last column are written once
+        self.paths[:, 0] = self.start_positions
+        self.paths[:, -1] = self.start_positions
+
+
+    def update_choice_info(self, pheramones, visibilities, floor=None):
+        """ Precomputes the attractiveness of every edge for the coming epoch
+
+        The roulette only depends on ratios, so pheramones may be off by any global scale factor.
+
+        Args:
+            pheramones: Adjacency matrix representing graph pheramones
+            visibilities: Adjacency matrix representing graph visibility
+            floor: Lower bound applied to pheramones as they are read. Defaults to None.
+        """
+        # Only edges that received pheramones need refreshing while the floor, and so every other edge, stays put
+        if (self.changed_paths is not None and pheramones is self.pheramones and visibilities is self.visibilities
+                and floor == self.floor):
+            self.update_changed_edges()
+            return
+
+        self.pheramones = pheramones
+        self.visibilities = visibilities
+        self.floor = floor
+        self.changed_paths = []
+        if self.neighbours is None and isinstance(pheramones, SymmetricMatrix):
+            # Attractiveness is symmetric as well, so it is computed and stored packed
+            self.choice_info = SymmetricMatrix(self.edge_info(pheramones.data, visibilities.data))
+        elif self.neighbours is None:
+            self.choice_info = self.edge_info(pheramones, visibilities)
+        else:
+            rows = np.arange(self.num_cities)[:, None]
+            self.candidate_info = self.edge_info(pheramones[rows, self.neighbours], visibilities[rows, self.neighbours])
+
+
+    def mark_changed(self, paths):
+        """ Records edges whose pheramones changed since the choice info was last built
+
+        Args:
+            paths: (m x n+1) matrix of closed paths, read when the choice info is next refreshed
+        """
+        if self.changed_paths is not None:
+            self.changed_paths.append(paths)
+
+
+    def invalidate(self):
+        """ Makes the next update_choice_info rebuild everything, e.g. after every pheramone was rewritten
+        """
+        self.changed_paths = None
+
+
+    def update_changed_edges(self):
+        """ Refreshes the choice info of the edges recorded by mark_changed, both directions
+        """
+        changed_paths = self.changed_paths
+        self.changed_paths = []
+        if len(changed_paths) == 0:
+            return
+        prev_nodes = np.concatenate([paths[:, :-1].ravel() for paths in changed_paths])
+        next_nodes = np.concatenate([paths[:, 1:].ravel() for paths in changed_paths])
+
+        info = self.choice_info if self.neighbours is None else self.candidate_info
+        if 2 * len(prev_nodes) > np.prod(info.shape):
+            # Touching most cells one by one costs more than recomputing them all
+            self.changed_paths = None
+            self.update_choice_info(self.pheramones, self.visibilities, self.floor)
+            return
+
+        keys = np.unique(np.concatenate((prev_nodes.astype(np.int64) * self.num_cities + next_nodes,
+                                         next_nodes.astype(np.int64) * self.num_cities + prev_nodes)))
+        if self.neighbours is None:
+            rows, cols = np.divmod(keys, self.num_cities)
+            self.choice_info[rows, cols] = self.edge_info(self.pheramones[rows, cols], self.visibilities[rows, cols])
+            return
+
+        # Edges off the candidate lists have no precomputed cell
+        if self.candidate_keys is None:
+            flat_keys = (np.arange(self.num_cities)[:, None] * self.num_cities + self.neighbours).ravel()
+            self.candidate_cells = np.argsort(flat_keys)
+            self.candidate_keys = flat_keys[self.candidate_cells]
+        positions = np.minimum(np.searchsorted(self.candidate_keys, keys), len(self.candidate_keys) - 1)
+        found = self.candidate_keys[positions] == keys
+        rows, cols = np.divmod(keys[found], self.num_cities)
+        self.candidate_info.ravel()[self.candidate_cells[positions[found]]] = self.edge_info(
+            self.pheramones[rows, cols], self.visibilities[rows, cols])
+
+
+    def edge_info(self, pheramones, visibilities):
+        """ Combines pheramones and visibilities into edge attractiveness
+
+        Args:
+            pheramones: Pheramones of the edges
+            visibilities: Visibilities of the same edges
+
+        Returns:
+            info: pheramones**alpha * visibilities**beta
+        """
+        if self.floor is not None:
+            pheramones = np.maximum(pheramones, self.floor)
+        return np.power(pheramones, self.alpha) * np.power(visibilities, self.beta)
+
+
+    def full_rows(self, current):
+        """ Attractiveness of every city from each current city
+
+        Args:
+            current: Array of current cities
+
+        Returns:
+            weights: (len(current) x n) matrix, always a fresh copy
+        """
+        if self.choice_info is not None:
+            return self.choice_info[current]
+        return self.edge_info(self.pheramones[current], self.visibilities[current])
+
+
+    def choose_full(self, current, unvisited, rand, greedy=None):
+        """ Roulette draw over every unvisited city
+
+        Args:
+            current: Array of current cities, one per ant
+            unvisited: (ants x n) mask of cities each ant has yet to visit
+            rand: Uniform random numbers in [0, 1), one per ant
+            greedy: Mask of ants taking the most attractive city instead. Defaults to None.
+
+        Returns:
+            next_nodes: Array of chosen cities
+        """
+        weights = self.full_rows(current)
+        weights *= unvisited
+        next_nodes, totals = self.sampler.pick(weights, rand, greedy)
+
+        # Ants with no attractive city left (e.g. zero distance edges) pick uniformly among unvisited cities
+        stuck = ~(totals > 0)
+        if stuck.any():
+            next_nodes[stuck] = self.sampler.pick(unvisited[stuck], rand[stuck])[0]
+        return next_nodes
+
+
+    def choose_candidates(self, current, unvisited, rand, greedy=None):
+        """ Roulette draw restricted to unvisited nearest neighbours, falling back to every city once they run out
+
+        Args:
+            current: Array of current cities, one per ant
+            unvisited: (ants x n) mask of cities each ant has yet to visit
+            rand: Uniform random numbers in [0, 1), one per ant
+            greedy: Mask of ants taking the most attractive candidate instead. Defaults to None.
+
+        Returns:
+            next_nodes: Array of chosen cities
+        """
+        ant_index = np.arange(len(current))
+        candidates = self.neighbours[current]
+        weights = self.candidate_info[current]
+        weights *= unvisited[ant_index[:, None], candidates]
+        picks, totals = self.sampler.pick(weights, rand, greedy)
+        next_nodes = candidates[ant_index, picks]
+
+        # Only ants whose every candidate has been visited pay for a full row
+        exhausted = ~(totals > 0)
+        if exhausted.any():
+            next_nodes[exhausted] = self.choose_full(current[exhausted], unvisited[exhausted], rand[exhausted],
+                                                     None if greedy is None else greedy[exhausted])
+        return next_nodes
+
+
+    def construct(self, start_positions=None):
+        """ Builds a tour for every ant, one vectorised roulette draw per step across each block of ants
+
+        Args:
+            start_positions: Starting cities of throwaway ants (e.g. for evaluation).
+                Defaults to None, building the colony's own tours in place.
+
+        Returns:
+            tours: (ants x n) view of the tours in found_path order, i.e. the n-1 visited cities followed by the start
+        """
+        if start_positions is None:
+            paths = self.paths
+            unvisited = self.unvisited
+        else:
+            paths = np.empty((len(start_positions), self.num_cities + 1), dtype=np.int32)
+            paths[:, 0] = start_positions
+            paths[:, -1] = start_positions
+            unvisited = np.empty((len(start_positions), self.num_cities), dtype=bool)
+
+        if self.executor is None:
+            self.construct_batch(paths, unvisited, self.sampler)
+            return paths[:, 1:]
+
+        # Contiguous blocks of ants, each drawing from its own sampler so a run only depends on the seed and thread count
+        bounds = [len(paths) * i // len(self.samplers) for i in range(0, len(self.samplers) + 1)]
+        batches = [(paths[start:end], unvisited[start:end], sampler)
+                   for start, end, sampler in zip(bounds[:-1], bounds[1:], self.samplers) if end > start]
+        if self.compiled():
+            # The kernels already spread ants over every core, batches are only kept for their random streams
+            for batch in batches:
+                self.construct_batch(*batch)
+        else:
+            # Every batch reads the same choice info, NumPy releases the GIL inside its row operations
+            list(self.executor.map(lambda batch: self.construct_batch(*batch), batches))
+        return paths[:, 1:]
+
+
+    def construct_batch(self, paths, unvisited, sampler):
+        """ Builds the tours of a block of ants, one vectorised roulette draw per step across the block
+
+        Args:
+            paths: (ants x n+1) closed paths with their first and last column set, filled in place
+            unvisited: (ants x n) scratch mask
+            sampler: Sampler drawing the block's random numbers
+        """
+        ant_index = np.arange(len(paths))
+        unvisited.fill(True)
+        current = paths[:, 0]
+        unvisited[ant_index, current] = False
+
+        # Every random number for the epoch is drawn up front
+        rands, greedy = sampler.draw(self.num_cities - 1, len(paths))
+        if self.compiled():
+            self.construct_compiled(paths, unvisited, rands, greedy)
+            return
+
+        for step in range(1, self.num_cities):
+            step_greedy = None if greedy is None else greedy[step - 1]
+            if self.neighbours is None:
+                next_nodes = self.choose_full(current, unvisited, rands[step - 1], step_greedy)
+            else:
+                next_nodes = self.choose_candidates(current, unvisited, rands[step - 1], step_greedy)
+
+            paths[:, step] = next_nodes
+            unvisited[ant_index, next_nodes] = False
+            current = next_nodes
+
+
+    def compiled(self):
+        """ Whether construction runs on the Numba kernels, which only read full NumPy matrices
+
+        Returns:
+            compiled: False for the NumPy backend and for packed or sparse storage
+        """
+        if self.backend != "numba":
+            return False
+        if self.neighbours is None:
+            return isinstance(self.choice_info, np.ndarray)
+        return isinstance(self.pheramones, np.ndarray) and isinstance(self.visibilities, np.ndarray)
+
+
+    def construct_compiled(self, paths, unvisited, rands, greedy):
+        """ Builds the tours of a block of ants with the Numba kernels
+
+        Args:
+            paths: (ants x n+1) closed paths with their first and last column set, filled in place
+            unvisited: (ants x n) scratch mask
+            rands: (n-1 x ants) uniform random numbers
+            greedy: (n-1 x ants) exploitation mask, None when q0 is 0
+        """
+        if greedy is None:
+            greedy = np.empty((0, 0), dtype=bool)
+        if self.neighbours is None:
+            Kernels.construct_full(self.choice_info, paths, unvisited, rands, greedy)
+            return
+        # Cast so the fallback rows are floored in the pheramones' dtype, like np.maximum does
+        floor = self.pheramones.dtype.type(-np.inf if self.floor is None else self.floor)
+        Kernels.construct_candidates(self.candidate_info, self.neighbours, self.pheramones, self.visibilities,
+                                     self.alpha, self.beta, floor, paths, unvisited, rands, greedy)
+
+
+    def evaluate(self, distances):
+        """ Costs of every tour in the colony, written into the preallocated costs array
+
+        Args:
+            distances: Adjacency matrix representing graph distances
+
+        Returns:
+            costs: Array of tour costs, one per ant
+        """
+        if self.backend == "numba" and isinstance(distances, np.ndarray):
+            Kernels.tour_costs(distances, self.paths, self.costs)
+            return self.costs
+        # Summed in float64 whatever the precision of the distances
+        np.sum(distances[self.paths[:, :-1], self.paths[:, 1:]], axis=1, dtype=np.float64, out=self.costs)
+        return self.costs
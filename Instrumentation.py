@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+import numpy as np
+import json
+import sys
+import time
+import tracemalloc
+
+class Instrumentation:
+    def __init__(self, callbacks=None, trace_path=None, track_memory=False):
+        """ Constructor for Instrumentation, per-epoch records of where a solver's time and memory go
+
+        Every epoch produces one record: the wall-clock seconds and allocated blocks of each phase (step_all,
+        improve_tours, update_best, update_pheramones, decay_pheramones) and statistics of the epoch's tour costs.
+        Records are plain dicts handed to every callback and, given a trace_path, appended to a JSON-lines file.
+        Solvers without an Instrumentation never time anything.
+
+        Args:
+            callbacks: Functions called with every record. Defaults to None.
+            trace_path: JSON-lines file records are appended to. Defaults to None (no file).
+            track_memory: Also record each phase's peak and retained bytes with tracemalloc, which NumPy reports
+                its arrays to. Slows the solver down noticeably. Defaults to False.
+        """
+        self.callbacks = list(callbacks or [])
+        self.trace_path = trace_path
+        self.track_memory = track_memory
+        # Opened on the first record so instrumented solvers can still be handed to worker processes
+        self.trace = None
+        self.started_tracing = False
+        self.epochs = 0
+        self.seconds = 0.0
+        self.record = None
+
+
+    @contextmanager
+    def phase(self, name):
+        """ Times a phase of the current epoch
+
+        Args:
+            name: Name the phase is recorded under
+        """
+        if self.track_memory:
+            tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        # Net change in interpreter memory blocks, a cheap count of what the phase left allocated
+        start_blocks = sys.getallocatedblocks()
+        start = time.perf_counter()
+        yield
+        phase = {"seconds": time.perf_counter() - start, "blocks": sys.getallocatedblocks() - start_blocks}
+        if self.track_memory:
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            phase["peak_bytes"] = peak_bytes - start_bytes
+            phase["retained_bytes"] = current_bytes - start_bytes
+        self.record["phases"][name] = phase
+
+
+    def begin_epoch(self, solver):
+        """ Starts the record of an epoch
+
+        Args:
+            solver: Solver about to run the epoch
+        """
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        # Numbered by the solver rather than this run, so a resumed run's records carry on where the checkpoint was
+        self.record = {"event": "epoch", "solver": solver.name, "epoch": solver.epochs_run, "phases": {}}
+
+
+    def end_epoch(self, solver, converged):
+        """ Completes the record of an epoch and emits it
+
+        Args:
+            solver: Solver that has just run the epoch
+            converged: Whether the epoch ended the run
+        """
+        costs = solver.costs
+        record = self.record
+        record["seconds"] = sum(phase["seconds"] for phase in record["phases"].values())
+        record["costs"] = {"min": float(np.min(costs)), "mean": float(np.mean(costs)), "max": float(np.max(costs)),
+                           "std": float(np.std(costs))}
+        record["best"] = float(solver.current_best_dis)
+        record["pheramone_scale"] = solver.pheramone_scale
+        record["converged"] = bool(converged)
+        self.epochs += 1
+        self.seconds += record["seconds"]
+        self.record = None
+        self.emit(record)
+
+
+    def end_run(self, solver):
+        """ Emits the summary of a run, closes the trace file and stops tracemalloc if it was started here
+
+        Args:
+            solver: Solver that has just finished run()
+        """
+        self.emit({"event": "run", "solver": solver.name, "epochs": self.epochs, "seconds": self.seconds,
+                   "best": float(solver.current_best_dis), "converged_at": solver.converged_at,
+                   "stopped_by": solver.stopped_by})
+        self.epochs = 0
+        self.seconds = 0.0
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+
+    def emit(self, record):
+        """ Hands a record to every callback and to the trace file
+
+        Args:
+            record: Dict of JSON-serialisable values
+        """
+        for callback in self.callbacks:
+            callback(record)
+        if self.trace_path is not None:
+            if self.trace is None:
+                # Line buffered so a crashed run still leaves every finished epoch behind
+                self.trace = open(self.trace_path, "a", buffering=1)
+            self.trace.write(json.dumps(record) + "\n")
+
+
+    def __getstate__(self):
+        # Open files do not pickle, worker processes reopen the trace themselves
+        state = self.__dict__.copy()
+        state["trace"] = None
+        return state
@@ -0,0 +1,212 @@
+import numpy as np
+
+# Numba is optional, without it the kernels stay plain Python and the solvers keep to the NumPy backend
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """ Stand-in for numba.njit leaving the kernels uncompiled
+        """
+        return lambda function: function
+
+# Implementations of tour construction, cost evaluation and deposits
+BACKENDS = ("numpy", "numba")
+
+
+def resolve_backend(backend):
+    """ Backend a colony actually runs on
+
+    Args:
+        backend: "numpy" or "numba"
+
+    Returns:
+        backend: The requested backend, "numpy" when Numba is not installed
+    """
+    if backend not in BACKENDS:
+        raise ValueError("backend must be 'numpy' or 'numba', got " + str(backend))
+    if backend == "numba" and not NUMBA_AVAILABLE:
+        print("Numba is not installed, falling back to the NumPy backend.")
+        return "numpy"
+    return backend
+
+
+# The kernels mirror the NumPy code step for step, down to accumulating in the matrices' own dtype,
+# so both backends build the same tours from the same random numbers
+
+@njit(cache=True)
+def pick(weights, rand, exploit):
+    """ Roulette draw over one row of weights, see Sampler.pick
+
+    Args:
+        weights: Non-negative weights, zero for cities that may not be chosen
+        rand: Uniform random number in [0, 1)
+        exploit: Take the largest weight instead
+
+    Returns:
+        pick: Chosen index, -1 when every weight is zero
+    """
+    # Summed in the weights' own dtype like np.cumsum, Numba would widen a plain 0.0 to float64
+    total = weights.dtype.type(0)
+    for j in range(len(weights)):
+        total += weights[j]
+    if not total > 0:
+        return -1
+
+    if exploit:
+        best = 0
+        for j in range(1, len(weights)):
+            if weights[j] > weights[best]:
+                best = j
+        return best
+
+    # First index whose cumulative weight passes the draw, 0 like argmax if rounding lets none pass
+    threshold = rand * total
+    cumulative = weights.dtype.type(0)
+    for j in range(len(weights)):
+        cumulative += weights[j]
+        if cumulative > threshold:
+            return j
+    return 0
+
+
+@njit(cache=True)
+def pick_unvisited(unvisited, rand):
+    """ Uniform draw among unvisited cities, for ants with no attractive city left
+
+    Args:
+        unvisited: Mask of cities the ant has yet to visit
+        rand: Uniform random number in [0, 1)
+
+    Returns:
+        pick: Chosen city
+    """
+    count = 0
+    for j in range(len(unvisited)):
+        count += unvisited[j]
+    threshold = rand * count
+    cumulative = 0
+    for j in range(len(unvisited)):
+        cumulative += unvisited[j]
+        if cumulative > threshold:
+            return j
+    return 0
+
+
+@njit(parallel=True, cache=True)
+def construct_full(choice_info, paths, unvisited, rands, greedy):
+    """ Builds every ant's tour over full rows of precomputed attractiveness, ants in parallel
+
+    Args:
+        choice_info: (n x n) matrix of edge attractiveness
+        paths: (ants x n+1) closed paths with their first and last column set, filled in place
+        unvisited: (ants x n) scratch mask
+        rands: (n-1 x ants) uniform random numbers, one per step and ant
+        greedy: (n-1 x ants) exploitation mask, or an empty array when q0 is 0
+    """
+    num_cities = choice_info.shape[0]
+    for ant in prange(paths.shape[0]):
+        weights = np.empty(num_cities, dtype=choice_info.dtype)
+        unvisited[ant, :] = True
+        current = paths[ant, 0]
+        unvisited[ant, current] = False
+
+        for step in range(1, num_cities):
+            for j in range(num_cities):
+                weights[j] = choice_info[current, j] if unvisited[ant, j] else 0
+            exploit = greedy.shape[0] > 0 and greedy[step - 1, ant]
+            next_node = pick(weights, rands[step - 1, ant], exploit)
+            if next_node < 0:
+                next_node = pick_unvisited(unvisited[ant], rands[step - 1, ant])
+
+            paths[ant, step] = next_node
+            unvisited[ant, next_node] = False
+            current = next_node
+
+
+@njit(parallel=True, cache=True)
+def construct_candidates(candidate_info, neighbours, pheramones, visibilities, alpha, beta, floor, paths, unvisited,
+                         rands, greedy):
+    """ Builds every ant's tour over its candidate lists, falling back to full rows once they run out, ants in parallel
+
+    Args:
+        candidate_info: (n x k) attractiveness of the candidate edges
+        neighbours: (n x k) candidate lists
+        pheramones: (n x n) matrix of stored pheramones, read for fallback rows
+        visibilities: (n x n) matrix of visibilities, read for fallback rows
+        alpha: Exponent applied to pheramones
+        beta: Exponent applied to visibilities
+        floor: Lower bound applied to pheramones as they are read, of the pheramones' dtype
+        paths: (ants x n+1) closed paths with their first and last column set, filled in place
+        unvisited: (ants x n) scratch mask
+        rands: (n-1 x ants) uniform random numbers, one per step and ant
+        greedy: (n-1 x ants) exploitation mask, or an empty array when q0 is 0
+    """
+    num_cities = pheramones.shape[0]
+    num_candidates = neighbours.shape[1]
+    for ant in prange(paths.shape[0]):
+        weights = np.empty(num_candidates, dtype=candidate_info.dtype)
+        row = np.empty(num_cities, dtype=candidate_info.dtype)
+        unvisited[ant, :] = True
+        current = paths[ant, 0]
+        unvisited[ant, current] = False
+
+        for step in range(1, num_cities):
+            for c in range(num_candidates):
+                weights[c] = candidate_info[current, c] if unvisited[ant, neighbours[current, c]] else 0
+            exploit = greedy.shape[0] > 0 and greedy[step - 1, ant]
+            next_node = pick(weights, rands[step - 1, ant], exploit)
+            if next_node >= 0:
+                next_node = neighbours[current, next_node]
+            else:
+                # Every candidate has been visited, the row is scored like Colony.edge_info
+                for j in range(num_cities):
+                    if unvisited[ant, j]:
+                        row[j] = max(pheramones[current, j], floor) ** alpha * visibilities[current, j] ** beta
+                    else:
+                        row[j] = 0
+                next_node = pick(row, rands[step - 1, ant], exploit)
+                if next_node < 0:
+                    next_node = pick_unvisited(unvisited[ant], rands[step - 1, ant])
+
+            paths[ant, step] = next_node
+            unvisited[ant, next_node] = False
+            current = next_node
+
+
+@njit(parallel=True, cache=True)
+def tour_costs(distances, paths, costs):
+    """ Cost of every closed path, summed in float64, ants in parallel
+
+    Args:
+        distances: (n x n) matrix of distances
+        paths: (ants x n+1) closed paths
+        costs: Array the costs are written into, one per ant
+    """
+    for ant in prange(paths.shape[0]):
+        total = 0.0
+        for step in range(paths.shape[1] - 1):
+            total += distances[paths[ant, step], paths[ant, step + 1]]
+        costs[ant] = total
+
+
+@njit(cache=True)
+def deposit_paths(pheramones, paths, amounts):
+    """ Adds pheramones along closed paths in both directions, see Colony.deposit_paths
+
+    Ants share edges, so the additions run serially in np.add.at's order rather than racing across threads.
+
+    Args:
+        pheramones: (n x n) matrix of pheramones, updated in place
+        paths: (m x n+1) closed paths
+        amounts: Pheramone dropped on every edge of each path, one per path
+    """
+    for path in range(paths.shape[0]):
+        for step in range(paths.shape[1] - 1):
+            pheramones[paths[path, step], paths[path, step + 1]] += amounts[path]
+    for path in range(paths.shape[0]):
+        for step in range(paths.shape[1] - 1):
+            pheramones[paths[path, step + 1], paths[path, step]] += amounts[path]
@@ -0,0 +1,190 @@
+import numpy as np
+
+# Improvements smaller than this are treated as floating point noise
+EPSILON = 1e-9
+
+# Neighbour list size used when the colony does not already have candidate lists
+SEARCH_NEIGHBOURS = 10
+
+
+class TourImprover:
+    def __init__(self, tour, distances, neighbours):
+        """ Constructor for TourImprover, 2-opt and Or-opt on one cyclic tour
+
+        Args:
+            tour: Array of cities in visiting order, the last city connects back to the first
+            distances: Adjacency matrix representing graph distances
+            neighbours: (n x k) nearest neighbour lists, closest first
+        """
+        self.tour = np.array(tour, dtype=np.int64)
+        self.num_cities = len(self.tour)
+        self.pos = np.empty(self.num_cities, dtype=np.int64)
+        self.pos[self.tour] = np.arange(self.num_cities)
+        self.distances = distances
+        self.neighbours = neighbours
+
+        # Don't-look bits, a city is only revisited once a move touches it
+        self.dont_look = np.zeros(self.num_cities, dtype=bool)
+
+
+    def succ(self, city):
+        return self.tour[(self.pos[city] + 1) % self.num_cities]
+
+
+    def pred(self, city):
+        return self.tour[self.pos[city] - 1]
+
+
+    def reverse(self, first, last):
+        """ Reverses the tour from city first forwards to city last, flipping whichever side is shorter
+
+        Args:
+            first: First city of the segment
+            last: Last city of the segment
+        """
+        i = self.pos[first]
+        j = self.pos[last]
+        length = (j - i) % self.num_cities + 1
+        # Reversing the complement gives the same cycle in the opposite direction
+        if 2 * length > self.num_cities:
+            i, j = (j + 1) % self.num_cities, (i - 1) % self.num_cities
+            length = self.num_cities - length
+        index = (i + np.arange(length)) % self.num_cities
+        self.tour[index] = self.tour[index[::-1]]
+        self.pos[self.tour[index]] = index
+
+
+    def wake(self, *cities):
+        for city in cities:
+            self.dont_look[city] = False
+
+
+    def try_two_opt(self, a):
+        """ Tries every 2-opt move that adds an edge from a to one of its neighbours
+
+        Args:
+            a: City whose tour edges are examined
+
+        Returns:
+            improved: Whether a move was applied
+        """
+        d = self.distances
+        for forward in (True, False):
+            b = self.succ(a) if forward else self.pred(a)
+            d_ab = d[a, b]
+            for c in self.neighbours[a]:
+                # Neighbours are sorted, once the new edge is not shorter nothing further can gain
+                if d[a, c] >= d_ab:
+                    break
+                e = self.succ(c) if forward else self.pred(c)
+                if c == b or e == a:
+                    continue
+                if d_ab + d[c, e] - d[a, c] - d[b, e] > EPSILON:
+                    # Edges (a, b) and (c, e) become (a, c) and (b, e)
+                    if forward:
+                        self.reverse(b, c)
+                    else:
+                        self.reverse(c, b)
+                    self.wake(a, b, c, e)
+                    return True
+        return False
+
+
+    def try_or_opt(self, a):
+        """ Tries moving the segment of 1 to 3 cities starting at a next to one of a's neighbours
+
+        Args:
+            a: First city of the moved segment
+
+        Returns:
+            improved: Whether a move was applied
+        """
+        d = self.distances
+        for length in (1, 2, 3):
+            if length + 2 > self.num_cities:
+                break
+            start = self.pos[a]
+            segment = self.tour[(start + np.arange(length)) % self.num_cities]
+            last = segment[-1]
+            p = self.pred(a)
+            nx = self.succ(last)
+            removal_gain = d[p, a] + d[last, nx] - d[p, nx]
+            if removal_gain <= EPSILON:
+                continue
+
+            for c in self.neighbours[a]:
+                if c in segment:
+                    continue
+                # a sits next to c either as c -> a ... last -> e or as e -> last ... a -> c
+                for e, reverse in ((self.succ(c), False), (self.pred(c), True)):
+                    if e in segment:
+                        continue
+                    if reverse:
+                        added = d[e, last] + d[a, c] - d[e, c]
+                    else:
+                        added = d[c, a] + d[last, e] - d[c, e]
+                    if removal_gain - added > EPSILON:
+                        self.move_segment(segment, c, e, reverse)
+                        self.wake(p, nx, c, e, a, last)
+                        return True
+        return False
+
+
+    def move_segment(self, segment, c, e, reverse):
+        """ Moves a segment between adjacent cities c and e
+
+        Args:
+            segment: Array of consecutive cities to move
+            c: City the segment's first city ends up next to
+            e: Other city of the insertion edge
+            reverse: True when e precedes c in the tour
+        """
+        remaining = np.delete(self.tour, (self.pos[segment[0]] + np.arange(len(segment))) % self.num_cities)
+        if reverse:
+            # e -> last ... a -> c
+            insert_at = np.nonzero(remaining == c)[0][0]
+            moved = segment[::-1]
+        else:
+            # c -> a ... last -> e
+            insert_at = np.nonzero(remaining == c)[0][0] + 1
+            moved = segment
+        self.tour = np.concatenate((remaining[:insert_at], moved, remaining[insert_at:]))
+        self.pos[self.tour] = np.arange(self.num_cities)
+
+
+    def improve(self, max_passes=1000):
+        """ Runs 2-opt and Or-opt until no city has a move left
+
+        Args:
+            max_passes: Safety bound on the number of sweeps over the active cities. Defaults to 1000.
+
+        Returns:
+            tour: Improved tour in visiting order
+        """
+        for n in range(0, max_passes):
+            active = np.nonzero(~self.dont_look)[0]
+            if len(active) == 0:
+                break
+            for a in active:
+                if self.dont_look[a]:
+                    continue
+                if not (self.try_two_opt(a) or self.try_or_opt(a)):
+                    self.dont_look[a] = True
+        return self.tour
+
+
+def improve_path(path, distances, neighbours):
+    """ Applies local search to a path in found_path order, keeping its starting city last
+
+    Args:
+        path: Visited cities ending back at the starting position
+        distances: Adjacency matrix representing graph distances
+        neighbours: (n x k) nearest neighbour lists, closest first
+
+    Returns:
+        path: Improved path in found_path order
+    """
+    start = path[-1]
+    tour = TourImprover(path, distances, neighbours).improve()
+    # Rotated so the starting city is last again
+    return np.roll(tour, len(tour) - 1 - np.nonzero(tour == start)[0][0])
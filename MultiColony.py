@@ -0,0 +1,160 @@
+from Cache import InstanceCache, CACHE_DIR, array_name
+from Symmetric import pack_if_symmetric
+from Strategies import closed_path
+from TSPLIB import load_graph
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import os
+import random
+
+def adopt_tour(solver, path, cost):
+    """ Hands a migrating tour to a colony, which keeps it and reinforces it if it beats its own best
+
+    Args:
+        solver: ACO_TSP, EAS_TSP or MMAS_TSP instance
+        path: Tour in found_path order, ending back at its start
+        cost: Total cost of the tour
+    """
+    if cost >= solver.current_best_dis:
+        return
+    solver.current_best_path = list(path)
+    solver.current_best_dis = cost
+    solver.deposit_pheramones(closed_path(path), [solver.dropoff_rate / cost])
+
+
+def colony_worker(solver_class, graph_path, shared, seed, solver_kwargs, rounds, interval, conn):
+    """ Runs one colony in its own process, trading best tours with the runner every interval epochs
+
+    Args:
+        solver_class: ACO_TSP, EAS_TSP or MMAS_TSP
+        graph_path: Path of the graph, only used for naming
+        shared: (shared memory name, shape, dtype) of the distance matrix, or the matrix itself if it is not an ndarray
+        seed: Seed of this colony's random streams
+        solver_kwargs: Keyword arguments for solver_class
+        rounds: Number of migration rounds
+        interval: Epochs between migrations
+        conn: Pipe end connected to the runner
+    """
+    memory = None
+    if isinstance(shared, tuple):
+        # Attaches to the runner's copy rather than receiving a pickled matrix
+        name, shape, dtype = shared
+        memory = shared_memory.SharedMemory(name=name)
+        distances = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+    else:
+        distances = shared
+
+    random.seed(seed)
+    np.random.seed(seed)
+    np.seterr(divide='ignore')
+    solver = solver_class(graph_path=graph_path, distances=distances, **solver_kwargs)
+
+    converged_at = rounds * interval
+    for n in range(0, rounds):
+        for m in range(0, interval):
+            # Converged colonies keep taking part in migrations so the ring stays in step
+            if converged_at == rounds * interval and solver.epoch():
+                converged_at = n * interval + m
+        conn.send((solver.current_best_path, solver.current_best_dis))
+        path, cost = conn.recv()
+        adopt_tour(solver, path, cost)
+
+    conn.send((solver.current_best_path, solver.current_best_dis, converged_at))
+    conn.close()
+    del distances
+    if memory is not None:
+        memory.close()
+
+
+def run_multi_colony(solver_class, graph_path, num_colonies=None, max_epoch=300, interval=10, topology="ring",
+                     seed=1, cache_dir=CACHE_DIR, **solver_kwargs):
+    """ Runs independent colonies across a pool of processes with periodic best-tour migration
+
+    The distance matrix lives in shared memory so it is never pickled to the workers.
+    Every interval epochs each colony receives either its ring neighbour's best tour ("ring")
+    or the best tour of all colonies ("all").
+
+    Args:
+        solver_class: ACO_TSP, EAS_TSP or MMAS_TSP
+        graph_path: Path of the graph to solve
+        num_colonies: Number of colonies, one process each. Defaults to the number of CPUs.
+        max_epoch: Epochs run by every colony, rounded up to whole migration rounds. Defaults to 300.
+        interval: Epochs between migrations. Defaults to 10.
+        topology: "ring" or "all". Defaults to "ring".
+        seed: Colony i is seeded with seed + i. Defaults to 1.
+        cache_dir: Directory of the binary instance cache, None to always reparse. Defaults to CACHE_DIR.
+        **solver_kwargs: Forwarded to every solver_class constructor
+
+    Returns:
+        best_path: Best path found by any colony
+        best_dis: Total cost (distance) of best_path
+    """
+    if topology not in ("ring", "all"):
+        raise ValueError("topology must be 'ring' or 'all', got " + str(topology))
+    num_colonies = num_colonies or os.cpu_count()
+
+    # Loaded at the solvers' precision so colonies attach to the matrix without converting it
+    precision = solver_kwargs.get("precision", "float64")
+    cache = InstanceCache(graph_path, cache_dir)
+    if solver_kwargs.get("symmetric"):
+        # Only the packed triangle is shared, each colony wraps it again
+        distances = cache.fetch(array_name("distances_symmetric", precision),
+                                lambda: pack_if_symmetric(load_graph(graph_path, dtype=np.dtype(precision))))
+    else:
+        distances = cache.fetch(array_name("distances", precision),
+                                lambda: load_graph(graph_path, dtype=np.dtype(precision)))
+    rounds = -(-max_epoch // interval)
+
+    memory = None
+    shared = distances
+    if isinstance(distances, np.ndarray):
+        memory = shared_memory.SharedMemory(create=True, size=distances.nbytes)
+        np.ndarray(distances.shape, dtype=distances.dtype, buffer=memory.buf)[:] = distances
+        shared = (memory.name, distances.shape, distances.dtype.str)
+
+    workers = []
+    conns = []
+    try:
+        for i in range(0, num_colonies):
+            parent_conn, child_conn = mp.Pipe()
+            worker = mp.Process(target=colony_worker, args=(solver_class, graph_path, shared, seed + i,
+                                                             solver_kwargs, rounds, interval, child_conn))
+            worker.start()
+            workers.append(worker)
+            conns.append(parent_conn)
+
+        for n in range(0, rounds):
+            bests = [conn.recv() for conn in conns]
+            if topology == "ring":
+                # Colony i receives from colony i - 1
+                incoming = [bests[i - 1] for i in range(0, num_colonies)]
+            else:
+                incoming = [min(bests, key=lambda best: best[1])] * num_colonies
+            for conn, best in zip(conns, incoming):
+                conn.send(best)
+
+        results = [conn.recv() for conn in conns]
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        if memory is not None:
+            memory.close()
+            memory.unlink()
+
+    best_path, best_dis, converged_at = min(results, key=lambda result: result[1])
+    print("==== Multi-colony " + solver_class.__name__ + " x" + str(num_colonies) + " ====")
+    print("Final Path: " + str(best_path))
+    print("Total Distance: " + str(best_dis))
+    print("Converged at (process killed at): " + str(converged_at))
+    return best_path, best_dis
+
+
+if __name__ == "__main__":
+    from MMAS_TSP import MMAS_TSP
+    graph_path = "./TSPLIB_XML/" + input("Graph name here (Graphs stored in ./TSPLIB_XML): ")
+    print("")
+    run_multi_colony(MMAS_TSP, graph_path)
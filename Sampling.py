@@ -0,0 +1,92 @@
+import numpy as np
+
+class Sampler:
+    def __init__(self, seed=None, q0=0.0):
+        """ Constructor for Sampler, the next-city selection shared by a colony's ants
+
+        Each colony owns a numpy Generator. Every random number of an epoch is drawn in one call into a reused
+        buffer, so selection costs no per-step RNG calls.
+
+        Args:
+            seed: Seed of the colony's Generator, or a Generator to draw from. Defaults to None, drawing the seed from
+                the legacy global stream so that np.random.seed still makes whole runs reproducible.
+            q0: Probability of exploiting, i.e. taking the most attractive city outright as in ACS.
+                Defaults to 0.0 (always the roulette).
+        """
+        if not 0 <= q0 <= 1:
+            raise ValueError("q0 must be within [0, 1], got " + str(q0))
+        if seed is None:
+            seed = np.random.randint(0, 2**31 - 1)
+        self.rng = np.random.default_rng(seed)
+        self.q0 = q0
+        self.buffer = None
+
+
+    def spawn(self, count):
+        """ Independent samplers for blocks of ants, their streams derived from this sampler's Generator
+
+        Args:
+            count: Number of samplers
+
+        Returns:
+            samplers: List of Samplers sharing q0
+        """
+        return [Sampler(rng, self.q0) for rng in self.rng.spawn(count)]
+
+
+    def draw(self, steps, num_ants):
+        """ Draws every random number an epoch of construction needs
+
+        Args:
+            steps: Number of construction steps
+            num_ants: Number of ants
+
+        Returns:
+            rands: (steps x ants) uniform numbers in [0, 1) for the roulette
+            greedy: (steps x ants) mask of ants exploiting at each step, None when q0 is 0
+        """
+        shape = (2 if self.q0 > 0 else 1, steps, num_ants)
+        if self.buffer is None or self.buffer.shape != shape:
+            self.buffer = np.empty(shape)
+        self.rng.random(out=self.buffer)
+        if self.q0 > 0:
+            return self.buffer[0], self.buffer[1] < self.q0
+        return self.buffer[0], None
+
+
+    def pick(self, weights, rand, greedy=None):
+        """ Roulette draw on every row of a weight matrix
+
+        A vectorised argmax over the cumulative weights beats a flattened searchsorted here,
+        which has to normalise every row first.
+
+        Args:
+            weights: (ants x m) non-negative weights, zero for cities that may not be chosen
+            rand: Uniform random numbers in [0, 1), one per row
+            greedy: Mask of rows taking their largest weight instead. Defaults to None.
+
+        Returns:
+            picks: Chosen column of every row, meaningless for rows whose total is 0
+            totals: Total weight of every row
+        """
+        cumulative = np.cumsum(weights, axis=1)
+        totals = cumulative[:, -1]
+        # First column whose cumulative weight passes the draw, zero weights never pass as they add nothing
+        picks = np.argmax(cumulative > (rand * totals)[:, None], axis=1)
+        if greedy is not None and greedy.any():
+            picks[greedy] = np.argmax(weights[greedy], axis=1)
+        return picks, totals
+
+
+def pick_one(weights, rand):
+    """ Roulette draw on a single row of weights by binary search over its cumulative weights
+
+    Args:
+        weights: Non-negative weights, zero for cities that may not be chosen
+        rand: Uniform random number in [0, 1)
+
+    Returns:
+        pick: Chosen index
+    """
+    cumulative = np.cumsum(weights)
+    return np.searchsorted(cumulative, rand * cumulative[-1], side="right")
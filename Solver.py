@@ -0,0 +1,739 @@
+from Ants import Ants
+from Colony import Colony, nearest_neighbours, deposit_paths, set_edges
+from Strategies import AllAntsUpdate
+from LocalSearch import improve_path, SEARCH_NEIGHBOURS
+import numpy as np
+from TSPLIB import load_graph
+from Cache import InstanceCache, CACHE_DIR, array_name
+from Symmetric import SymmetricMatrix, is_symmetric, pack_if_symmetric, packed_size, storage
+from Sparse import SparsePheramones
+from Sampling import Sampler
+from Stopping import TourAgreement
+from Checkpoint import CheckpointWriter, save_checkpoint, load_checkpoint
+import random
+from typing import List
+from os.path import isfile
+import inspect
+
+# Instance solved when no graph_path is given
+DEFAULT_GRAPH = "./TSPLIB_XML/brazil58.xml"
+
+# Floating point types the graph matrices can be stored in
+PRECISIONS = ("float64", "float32")
+
+# Version of the checkpoint layout, bumped whenever the saved state changes
+CHECKPOINT_VERSION = 1
+
+# Evaporation is folded back into the stored pheramones once the global scale drops below this
+RENORMALISE_SCALE = 1e-6
+
+class Solver:
+    # Constructor defaults a variant changes, keyword arguments it is given still take precedence
+    DEFAULTS = {}
+
+    def __init__ (self, graph_path=DEFAULT_GRAPH, update=None, candidate_size=None, cache_dir=CACHE_DIR,
+                  distances=None, max_epoch=300, decay_rate=0.9, num_ants=40, dropoff_rate=3, alpha=2, beta=1, q0=0.0, local_search=None,
+                  precision="float64", symmetric=False, sparse_pheramones=False, seed=None,
+                  backend="numpy", threads=1, stopping=None, instrumentation=None, checkpoint_path=None,
+                  checkpoint_interval=50, name="ACO"):
+        """Constructor for Solver, the core shared by every ACO variant
+
+        The core owns the graph, the pheramone matrix, the batched colony and the per-epoch tours and costs.
+        Variants only differ in their pheramone update strategy (see Strategies.py).
+
+        Args:
+            graph_path: path to TSPLIB graph, either the XML export or a standard .tsp file. Defaults to "graph_path".
+            update: Pheramone update strategy. Defaults to None (AllAntsUpdate, i.e. vanilla Ant System).
+            candidate_size: Number of nearest neighbours ants consider before falling back to every city.
+                Defaults to None (every city is scored at every step).
+            cache_dir: Directory of the binary instance cache, None to always reparse. Defaults to CACHE_DIR.
+            distances: Already parsed distance matrix (e.g. in shared memory) used instead of reading graph_path.
+                Defaults to None.
+            max_epoch: Maximum number of epochs. Defaults to 300.
+            decay_rate: Fraction of pheramones kept after each epoch. Defaults to 0.9.
+            num_ants: Number of ants in the colony. Defaults to 40.
+            dropoff_rate: Pheramones deposited per unit of inverse tour cost (Q). Defaults to 3.
+            alpha: Exponent applied to pheramones when ants choose their next city. Defaults to 2.
+            beta: Exponent applied to visibilities when ants choose their next city. Defaults to 1.
+            q0: Probability that an ant takes the most attractive city outright (ACS exploitation). Defaults to 0.0.
+            local_search: Apply 2-opt / Or-opt to "all" tours or only the epoch's "best" before pheramones are updated.
+                Defaults to None (tours are used as constructed).
+            precision: "float64" or "float32" storage for the distance, visibility and pheramone matrices.
+                float32 halves their memory, tour costs are still summed in float64. Defaults to "float64".
+            symmetric: Store symmetric instances' distances, visibilities and pheramones as packed upper triangles.
+                Asymmetric instances fall back to full matrices. Defaults to False.
+            sparse_pheramones: Keep explicit pheramones only for candidate and deposited edges, every other edge
+                shares one baseline value. Implies candidate lists and is always on for lazily computed graphs.
+                Defaults to False.
+            seed: Seed of the colony's random Generator. Defaults to None (drawn from np.random, so seeding it
+                still reproduces a run).
+            backend: "numpy", or "numba" for compiled construction, evaluation and deposits on full matrices.
+                Both give the same tours for the same seed. Falls back to "numpy" without Numba. Defaults to "numpy".
+            threads: Number of blocks of ants built concurrently on a thread pool, all reading the same pheramones.
+                Each block has its own random stream, so runs are reproducible for a given seed and thread count.
+                Defaults to 1.
+            stopping: Stopping criterion, or list of criteria of which the first to fire ends the run (see Stopping.py).
+                Defaults to None (TourAgreement, more than 90% of ants on the same tour).
+            instrumentation: Instrumentation recording per-phase timings, allocations and tour cost statistics of
+                every epoch for callbacks and a JSON-lines trace. Defaults to None (nothing is timed).
+            checkpoint_path: File run() periodically checkpoints the solver to, see resume(). Defaults to None.
+            checkpoint_interval: Number of epochs between checkpoints. Defaults to 50.
+            name: Name printed by run(). Defaults to "ACO".
+        """
+        # Constructor arguments a checkpoint rebuilds the solver from, strategies and criteria are saved with their state
+        self.parameters = {
+            "graph_path": graph_path, "candidate_size": candidate_size, "cache_dir": cache_dir, "max_epoch": max_epoch,
+            "decay_rate": decay_rate, "num_ants": num_ants, "dropoff_rate": dropoff_rate, "alpha": alpha,
+            "beta": beta, "q0": q0, "local_search": local_search, "precision": precision, "symmetric": symmetric,
+            "sparse_pheramones": sparse_pheramones, "seed": seed, "backend": backend, "threads": threads,
+            "checkpoint_path": checkpoint_path, "checkpoint_interval": checkpoint_interval, "name": name,
+        }
+        
+        # Parameters
+        self.name = name
+        self.update = update or AllAntsUpdate()
+        self.instrumentation = instrumentation
+        self.max_epoch = max_epoch
+        self.decay_rate = decay_rate
+        self.num_ants = num_ants
+        self.dropoff_rate = dropoff_rate
+        self.alpha = alpha
+        self.beta = beta
+        
+        if local_search not in (None, "best", "all"):
+            raise ValueError("local_search must be None, 'best' or 'all', got " + str(local_search))
+        self.local_search = local_search
+        
+        if precision not in PRECISIONS:
+            raise ValueError("precision must be 'float64' or 'float32', got " + str(precision))
+        self.precision = precision
+        self.dtype = np.dtype(precision)
+        # Lowest pheramone level kept after decay, raised to alpha it is still the square root of the smallest normal
+        # float, leaving as much headroom again for the visibility it is multiplied by
+        # float64 cannot realistically decay that far, so only float32 is bounded
+        self.pheramone_floor = None
+        if precision == "float32":
+            self.pheramone_floor = float(np.finfo(self.dtype).tiny) ** (1 / (2 * max(alpha, 1)))
+        
+        # Ensure file path is correct, unless the graph was handed over already parsed
+        if distances is None and not isfile(graph_path):
+            print("File does not exist in path entered.")
+            print("Please ensure the file name was entered correctly. \nProgram exited.")
+            exit()
+        
+        # Parsed matrices are memory-mapped from a binary cache keyed on the contents of graph_path
+        cache = InstanceCache(graph_path, cache_dir if distances is None else None)
+        if distances is None and symmetric:
+            # Symmetric instances are cached packed, asymmetric ones under the same entry as a full matrix
+            distances = cache.fetch(array_name("distances_symmetric", precision),
+                                    lambda: pack_if_symmetric(self.parse_graph(graph_path)))
+        elif distances is None:
+            distances = cache.fetch(array_name("distances", precision), lambda: self.parse_graph(graph_path))
+        elif isinstance(distances, np.ndarray) and distances.dtype != self.dtype:
+            distances = distances.astype(self.dtype)
+        if isinstance(distances, np.ndarray) and distances.ndim == 1:
+            distances = SymmetricMatrix(distances)
+        
+        # Coordinate metrics are symmetric by definition so lazily computed graphs qualify as well
+        self.symmetric = isinstance(distances, SymmetricMatrix) or (symmetric and not isinstance(distances, np.ndarray))
+        # Whether a tour costs the same in both directions, i.e. the instance is symmetric however it is stored
+        self.reversible = self.symmetric or not isinstance(distances, np.ndarray) or is_symmetric(distances)
+        
+        # Adjacency matrices for distance, pheramones, and our heuristic (visibility)
+        self.distances = distances
+        if isinstance(self.distances, SymmetricMatrix):
+            # Cheap to derive from the packed distances, so it is not cached
+            self.visibilities = self.init_visibilities(self.distances) # Our heuristic 
+        else:
+            self.visibilities = cache.fetch(array_name("visibilities", precision), lambda: self.init_visibilities(self.distances)) # Our heuristic 
+        
+        # Batched tour construction engine shared by the whole colony
+        # Candidate lists make each tour cost O(n*k) instead of O(n^2) on large graphs
+        neighbours = None
+        if not isinstance(self.distances, (np.ndarray, SymmetricMatrix)):
+            # Graphs too large for a dense matrix cannot hold a full choice or pheramone matrix either
+            sparse_pheramones = True
+        if sparse_pheramones:
+            # Sparse pheramones are laid out around the candidate lists
+            candidate_size = candidate_size or 20
+        if candidate_size:
+            neighbours = cache.fetch("neighbours_" + str(candidate_size),
+                                     lambda: nearest_neighbours(self.distances, candidate_size))
+        self.colony = Colony(len(self.distances), num_ants=self.num_ants, alpha=alpha, beta=beta, neighbours=neighbours,
+                             sampler=Sampler(seed, q0), backend=backend, threads=threads)
+        
+        self.sparse_pheramones = sparse_pheramones
+        self.pheramones = self.init_pheramones(self.distances, neighbours)
+        # Evaporation is lazy: the true pheramone level of an edge is its stored value times this global scale
+        # Deposits are divided by it, so an epoch only touches the edges that receive pheramones
+        self.pheramone_scale = 1.0
+        # Paths deposited on since the last evaporation, once every edge has been bounded the only ones that can
+        # exceed an upper bound
+        self.deposited_paths = []
+        # Starting levels can lie above an upper bound (e.g. a max_pheramone below 1) until the first evaporation
+        self.bounded_everywhere = False
+        
+        # Local search is restricted to nearest neighbour lists so it stays close to linear per tour
+        self.search_neighbours = None
+        if local_search:
+            self.search_neighbours = neighbours
+            if neighbours is None:
+                self.search_neighbours = cache.fetch("neighbours_" + str(SEARCH_NEIGHBOURS),
+                                                     lambda: nearest_neighbours(self.distances, SEARCH_NEIGHBOURS))
+        
+        # Generates an array of ants, thin views of the colony's preallocated state
+        # Scatter boolean determines if the ants should all start at 0, or at randomised cities
+        self.ants = self.generate_ants(self.num_ants, scatter=True)
+        
+        # Initialising current best path
+        self.current_best_path = []
+        self.current_best_dis = 999999999
+        
+        self.converged_at = 0
+        # Epochs completed by the current run, where run() carries on from after a resume
+        self.epochs_run = 0
+        # Set by restore() so the next run() continues the checkpointed run instead of starting a new one
+        self.resuming = False
+        
+        # Checkpoints are written in the background while the next epochs run
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_writer = CheckpointWriter()
+        
+        # Criteria deciding when further epochs stop paying off
+        if stopping is None:
+            stopping = TourAgreement()
+        self.stopping = list(stopping) if isinstance(stopping, (list, tuple)) else [stopping]
+        self.stopped_by = None
+        self.start_stopping()
+        
+        # Strategies that need a different starting state (e.g. ACS pheramone levels) set it up last
+        self.update.prepare(self)
+        
+        
+    @classmethod
+    def accepted_parameters(cls):
+        """ Keyword arguments the class's constructor takes, Solver's own plus a variant's extras
+
+        Returns:
+            defaults: Dict of parameter name to the default the class applies
+        """
+        defaults = {}
+        for init in dict.fromkeys((Solver.__init__, cls.__init__)):
+            for name, parameter in inspect.signature(init).parameters.items():
+                if name != "self" and parameter.kind != parameter.VAR_KEYWORD:
+                    defaults[name] = parameter.default
+        if cls is not Solver:
+            # Variants are defined by their update strategy
+            del defaults["update"]
+        defaults.update(cls.DEFAULTS)
+        return defaults
+
+
+    def __str__(self):
+        """ Overrides to_string function
+        """
+        lines = [
+            "Distances graph: " + str(self.distances), "",
+            "Pheramones graph: " + str(self.pheramones), "",
+            "Heuristics graph: " + str(self.visibilities), "",
+            str(self.ants[0]) + " x " + str(self.num_ants),
+        ]
+        lines.extend(str(ant) for ant in self.ants)
+        return "\n".join(lines)
+
+
+    def print_self(self):
+        """ Prints the graphs and the colony
+        """
+        print(self)
+
+
+    def parse_graph(self, path):
+        """ Turns a TSPLIB XML or .tsp file into a graph represented by an adjacency matrix
+
+        Args:
+            path: File path for the graph, format detected from its contents
+            
+        Returns:
+            adj_matrix: NumPy adjacency matrix representing the graph
+        """
+        # XML is streamed rather than loaded into a DOM, .tsp coordinates are turned into distances vectorised
+        return load_graph(path, dtype=self.dtype)
+        
+  
+    @property
+    def paths(self):
+        """ (ants x n+1) closed paths of the latest epoch, start city first and last
+        """
+        return self.colony.paths
+
+
+    @property
+    def tours(self):
+        """ (ants x n) tours of the latest epoch in found_path order
+        """
+        return self.colony.paths[:, 1:]
+
+
+    @property
+    def start_positions(self):
+        """ Starting city of every ant
+        """
+        return self.colony.start_positions
+
+
+    @property
+    def costs(self):
+        """ Tour costs of the latest epoch, one per ant
+        """
+        return self.colony.costs
+
+
+    @property
+    def lower_bound(self):
+        """ Lowest true pheramone level, from the update strategy and the precision's floor, None when unbounded
+        """
+        lower = self.update.bounds()[0]
+        if self.pheramone_floor is not None:
+            lower = self.pheramone_floor if lower is None else max(lower, self.pheramone_floor)
+        return lower
+
+
+    @property
+    def stored_lower_bound(self):
+        """ lower_bound in the units pheramones are stored in, None when unbounded
+        """
+        lower = self.lower_bound
+        if lower is None:
+            return None
+        return lower / self.pheramone_scale
+
+
+    def init_pheramones(self, graph, neighbours=None):
+        """ Initialise pheramones by generating and filling a nVertex x nVertex sized matrix by 1s
+
+        Args:
+            graph: Adjacency matrix representing graph distance
+            neighbours: Candidate lists, required for sparse pheramones. Defaults to None.
+
+        Returns:
+            pher_matrix: Adjacency matrix representing graph pheramones, packed for symmetric instances
+                or sparse when sparse_pheramones is set
+        """
+        if self.sparse_pheramones:
+            return SparsePheramones(len(graph), neighbours, dtype=self.dtype)
+        if self.symmetric:
+            return SymmetricMatrix(np.ones(packed_size(len(graph)), dtype=self.dtype))
+        return np.ones(shape=(len(graph), len(graph)), dtype=self.dtype)
+    
+    
+    def init_visibilities(self, graph):
+        """ Initialise visibility by generating a scaled down distance graph by an exponent of -1
+
+        Args:
+            graph: Adjacency matrix representing graph distance
+
+        Returns:
+            visibilities: Adjacency matrix representing graph visibility
+        """
+        # Very large coordinate graphs compute their visibility rows on demand as well, packed graphs stay packed
+        if not isinstance(graph, np.ndarray):
+            return graph.reciprocal()
+        
+        # Visibility is distance scaled down exponentially (pow of -1)
+        visibilities = 1/graph
+        # Ensures if distance is 0, the visibility is also 0 and not 1/0 which is approxed to infinity
+        visibilities[visibilities==np.inf] = 0
+        return visibilities
+        
+  
+    def generate_ants(self, num_ants, scatter=False) -> List[Ants]:
+        """ Generate an array of Ants
+
+        Args:
+            num_ants: Number of ants
+            scatter: Whether or not to scatter the ants position. Defaults to False.
+
+        Returns:
+            arr_ant: Array of Ants, views of their row in the colony
+        """
+        start_positions = []
+        for n in range(0, num_ants):
+            if(scatter):
+                # If scatter is True, randomise the starting position for the ants
+                ant_start_pos = random.randint(0, len(self.distances)-1) 
+            else:
+                # If not all the starting position for all the ants are 0
+                ant_start_pos = 0
+            start_positions.append(ant_start_pos)
+        return self.place_ants(start_positions)
+
+
+    def place_ants(self, start_positions) -> List[Ants]:
+        """ Places the colony on its starting cities
+
+        Args:
+            start_positions: Starting city of every ant
+
+        Returns:
+            arr_ant: Array of Ants, views of their row in the colony
+        """
+        self.colony.set_starts(start_positions)
+        return [Ants(starting_position=int(start), colony=self.colony, index=n) for n, start in enumerate(start_positions)]
+
+
+    def step_all(self):
+        """ Step all ants forward and calculates their found paths
+        """
+        # Pheramones only change between epochs so the edge attractiveness is computed once
+        self.colony.update_choice_info(self.pheramones, self.visibilities, self.stored_lower_bound)
+        # Tours are written straight into the colony's tour matrix, which the ants view
+        self.colony.construct()
+        
+        # Every tour's cost is evaluated once here and reused for best tracking, convergence and deposits
+        self.colony.evaluate(self.distances)
+
+
+    def improve_tours(self):
+        """ Applies 2-opt / Or-opt local search to the epoch's tours and refreshes their costs
+        """
+        if self.local_search == "best":
+            indices = np.array([np.argmin(self.costs)])
+        else:
+            indices = np.arange(len(self.tours))
+        
+        for i in indices:
+            self.ants[i].found_path = improve_path(self.ants[i].found_path, self.distances, self.search_neighbours)
+        paths = self.paths[indices]
+        self.costs[indices] = self.distances[paths[:, :-1], paths[:, 1:]].sum(axis=1, dtype=np.float64)
+
+
+    def update_best(self):
+        """ Update current best path based on all ants traversed path
+        
+        Returns:
+            convergence: Whether a stopping criterion says further epochs are not worth running
+        """
+        # Costs were computed once for the whole colony in step_all
+        # First ant with the lowest cost replaces the GLOBAL best path and distance if it beats it
+        first_best = np.argmin(self.costs)
+        if self.costs[first_best] < self.current_best_dis:
+            # Copied out, the ant's row is overwritten next epoch
+            self.current_best_path = self.ants[first_best].found_path.tolist()
+            self.current_best_dis = self.costs[first_best]
+        
+        return self.should_stop()
+
+
+    def start_stopping(self):
+        """ Resets the stopping criteria, e.g. the start of a time budget
+        """
+        for criterion in self.stopping:
+            criterion.start(self)
+
+
+    def should_stop(self):
+        """ Checks every stopping criterion against the latest epoch
+
+        Returns:
+            stop: Whether any criterion fired, the first one is kept in stopped_by
+        """
+        # Every criterion sees every epoch so windows and counters stay current
+        fired = [criterion for criterion in self.stopping if criterion.should_stop(self)]
+        if fired:
+            self.stopped_by = type(fired[0]).__name__
+        return len(fired) > 0
+
+
+    def update_pheramones(self):
+        """ Deposits pheramones in place as decided by the update strategy
+        """
+        self.update.deposit(self)
+        self.reset_ants()
+
+
+    def reset_ants(self):
+        """ Resets all ants, their rows are reused by the next epoch
+        """
+        for ant in self.ants:
+            ant.reset_ant()
+
+
+    def decay_pheramones(self):
+        """ Decays / evaporates pheramones by decay rate, plus any bounding the update strategy applies
+        """
+        self.update.decay(self)
+
+
+    def edge_pheramones(self, paths):
+        """ True pheramone levels along closed paths
+
+        Args:
+            paths: (m x n+1) matrix of closed paths
+
+        Returns:
+            values: (m x n) matrix of pheramone levels, bounds applied
+        """
+        values = self.pheramones[paths[:, :-1], paths[:, 1:]] * self.pheramone_scale
+        if self.lower_bound is not None:
+            values = np.maximum(values, self.lower_bound)
+        return values
+
+
+    def set_edge_pheramones(self, paths, values):
+        """ Sets true pheramone levels along closed paths, mirrored for symmetry
+
+        Args:
+            paths: (m x n+1) matrix of closed paths
+            values: (m x n) matrix of pheramone levels
+        """
+        set_edges(self.pheramones, paths, values / self.pheramone_scale)
+        self.deposited_paths.append(paths)
+        self.colony.mark_changed(paths)
+
+
+    def deposit_pheramones(self, paths, amounts):
+        """ Deposits pheramones along closed paths in place, mirrored for symmetry
+
+        Args:
+            paths: (m x n+1) matrix of closed paths, starting and ending at the same city
+            amounts: True pheramone dropped on every edge of each path, one per path
+        """
+        lower = self.stored_lower_bound
+        if lower is not None:
+            # Edges resting on the lazily applied lower bound take it on before anything is added
+            set_edges(self.pheramones, paths, np.maximum(self.pheramones[paths[:, :-1], paths[:, 1:]], lower))
+        deposit_paths(self.pheramones, paths, np.asarray(amounts) / self.pheramone_scale, self.colony.backend)
+        self.deposited_paths.append(paths)
+        # Only these edges need their choice info refreshed
+        self.colony.mark_changed(paths)
+
+
+    def evaporate(self, rate):
+        """ Evaporates every edge by shrinking the global scale
+
+        Args:
+            rate: Fraction of pheramones kept
+        """
+        self.pheramone_scale *= rate
+        upper = self.update.bounds()[1]
+        if upper is not None and not self.bounded_everywhere:
+            # The first evaporation bounds every edge at once, like clipping the whole matrix each epoch would
+            self.renormalise()
+        elif upper is not None:
+            # Untouched edges only ever fall from within the bounds, so just the deposited ones can need the upper bound
+            for paths in self.deposited_paths:
+                stored = self.pheramones[paths[:, :-1], paths[:, 1:]]
+                set_edges(self.pheramones, paths, np.minimum(stored, upper / self.pheramone_scale))
+        self.deposited_paths = []
+        if self.pheramone_scale < RENORMALISE_SCALE:
+            self.renormalise()
+
+
+    def renormalise(self):
+        """ Folds the global scale back into the stored pheramones and bounds every edge at once
+        """
+        pheramones = storage(self.pheramones)
+        pheramones *= self.pheramone_scale
+        self.pheramone_scale = 1.0
+        self.colony.invalidate()
+        lower, upper = self.lower_bound, self.update.bounds()[1]
+        if lower is not None or upper is not None:
+            np.clip(pheramones, lower, upper, out=pheramones)
+        self.bounded_everywhere = True
+
+
+    def epoch(self):
+        """ Run a single iteration / epoch of the ACO for TSP
+        """
+        if self.instrumentation is not None:
+            is_converged = self.instrumented_epoch()
+        else:
+            self.step_all()
+            if self.local_search:
+                self.improve_tours()
+            is_converged = self.update_best()
+            self.update_pheramones()
+            self.decay_pheramones()
+        # Counted here so callers driving epochs themselves (e.g. MultiColony, Benchmark) are numbered as well
+        self.epochs_run += 1
+        return is_converged
+
+
+    def instrumented_epoch(self):
+        """ epoch() with every phase recorded by the instrumentation, kept apart so plain epochs pay nothing for it
+        """
+        instrumentation = self.instrumentation
+        instrumentation.begin_epoch(self)
+        with instrumentation.phase("step_all"):
+            self.step_all()
+        if self.local_search:
+            with instrumentation.phase("improve_tours"):
+                self.improve_tours()
+        with instrumentation.phase("update_best"):
+            is_converged = self.update_best()
+        with instrumentation.phase("update_pheramones"):
+            self.update_pheramones()
+        with instrumentation.phase("decay_pheramones"):
+            self.decay_pheramones()
+        instrumentation.end_epoch(self, is_converged)
+        return is_converged
+
+
+    def eval(self):
+        """ Generates an ant and let it find a path based on the pheramones and heuristic for evaluation
+
+        Returns:
+            found_path: Array representing the found path
+            eval_cost: Number representing the total cost (distance) of the found path
+        """
+        evaluator_ant = Ants(0)
+        self.colony.update_choice_info(self.pheramones, self.visibilities, self.stored_lower_bound)
+        # Built in scratch arrays so the colony's own tours are left alone
+        evaluator_ant.set_path(self.colony.construct([evaluator_ant.start_pos])[0].tolist())
+        return evaluator_ant.found_path, evaluator_ant.eval_cost(self.distances)
+        
+        
+    def eval2(self):
+        """ Evaluates based on current best stored path and current best stored distance
+            This is NOT The settled local minima but instead a path found previously as the ants traversed
+
+        Returns:
+            found_path: Array representing the found path
+            eval_cost: Number representing the total cost (distance) of the found path
+        """
+        return self.current_best_path, self.current_best_dis
+    
+    
+    def checkpoint(self, path=None, wait=False):
+        """ Saves everything a run needs to carry on bit for bit: pheramones, best tour, epoch counter,
+            parameters, strategy and stopping state, and every random stream
+
+        Args:
+            path: Path of the checkpoint. Defaults to None (checkpoint_path).
+            wait: Write on the calling thread rather than in the background. Defaults to False.
+        """
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError("checkpoint needs a path, none given and checkpoint_path is not set")
+        
+        # Copied now and the state pickled by the writer right away, the writer thread must not see the next
+        # epoch's updates
+        arrays = {"pheramones": storage(self.pheramones).copy(), "start_positions": self.start_positions.copy()}
+        if isinstance(self.pheramones, SparsePheramones):
+            arrays["extra_keys"] = self.pheramones.extra_keys.copy()
+        state = {
+            "version": CHECKPOINT_VERSION, "class": type(self), "parameters": self.parameters,
+            "update": self.update, "stopping": self.stopping, "epochs_run": self.epochs_run,
+            "current_best_path": list(self.current_best_path), "current_best_dis": self.current_best_dis,
+            "converged_at": self.converged_at, "stopped_by": self.stopped_by, "pheramone_scale": self.pheramone_scale,
+            "samplers": [sampler.rng.bit_generator.state for sampler in self.colony.samplers],
+            "random": random.getstate(), "np_random": np.random.get_state(),
+        }
+        if wait:
+            self.checkpoint_writer.wait()
+            save_checkpoint(path, arrays, state)
+        else:
+            self.checkpoint_writer.submit(path, arrays, state)
+
+
+    def restore(self, arrays, state):
+        """ Loads the state saved by checkpoint() into a solver built with the same parameters
+
+        Args:
+            arrays: Dict of NumPy arrays from load_checkpoint
+            state: Dict of everything else from load_checkpoint
+        """
+        if state["version"] != CHECKPOINT_VERSION:
+            raise ValueError("Checkpoint version " + str(state["version"]) + " cannot be resumed by version "
+                             + str(CHECKPOINT_VERSION))
+        if isinstance(self.pheramones, SparsePheramones):
+            self.pheramones.extra_keys = arrays["extra_keys"]
+            self.pheramones.data = arrays["pheramones"].copy()
+        else:
+            storage(self.pheramones)[...] = arrays["pheramones"]
+        self.pheramone_scale = state["pheramone_scale"]
+        self.deposited_paths = []
+        # Checkpoints taken after an epoch hold pheramones that have been bounded everywhere already
+        self.bounded_everywhere = state["epochs_run"] > 0
+        # Rebuilt from the restored pheramones on the next epoch
+        self.colony.invalidate()
+        self.ants = self.place_ants(arrays["start_positions"])
+        
+        self.current_best_path = state["current_best_path"]
+        self.current_best_dis = state["current_best_dis"]
+        self.epochs_run = state["epochs_run"]
+        self.resuming = True
+        self.converged_at = state["converged_at"]
+        self.stopped_by = state["stopped_by"]
+        for sampler, rng_state in zip(self.colony.samplers, state["samplers"]):
+            sampler.rng.bit_generator.state = rng_state
+        random.setstate(state["random"])
+        np.random.set_state(state["np_random"])
+
+
+    @classmethod
+    def resume(cls, path, **overrides):
+        """ Rebuilds a solver from a checkpoint, run() then carries on exactly where the checkpointed run was
+
+        The graph is reloaded from the saved graph_path, already parsed graphs have to be passed again as distances.
+
+        Args:
+            path: Path of a checkpoint written by checkpoint()
+            overrides: Constructor arguments replacing the saved ones, e.g. max_epoch, distances or instrumentation
+
+        Returns:
+            solver: Solver of the checkpointed class
+        """
+        arrays, state = load_checkpoint(path)
+        parameters = dict(state["parameters"])
+        parameters.update(overrides)
+        # Variants only pick the update strategy and defaults, which are all part of the saved state
+        solver_class = state["class"]
+        solver = solver_class.__new__(solver_class)
+        Solver.__init__(solver, update=state["update"], **parameters)
+        solver.restore(arrays, state)
+        if "stopping" not in overrides:
+            # Saved criteria keep their windows and counters
+            solver.stopping = state["stopping"]
+        return solver
+
+
+    def run(self):
+        """ Run max_epoch number of iterations of the ACO. Every call runs max_epoch epochs again,
+            except the first run() after resume(), which finishes the checkpointed run from epochs_run.
+        """
+        
+        # Set counter for when the colony has converged at max_epoch
+        converged_n = self.max_epoch
+        if self.resuming:
+            self.resuming = False
+        else:
+            self.epochs_run = 0
+            self.stopped_by = None
+            self.start_stopping()
+        
+        # Running max_epoch iterations of an epoch
+        for n in range(self.epochs_run, self.max_epoch):
+            is_converged = self.epoch()
+            if self.checkpoint_path is not None and self.epochs_run % self.checkpoint_interval == 0:
+                self.checkpoint()
+            # If it is converged break out to save processing power / time
+            if (is_converged):
+                converged_n = n
+                break
+        # The last checkpoint has to land before the process may exit
+        self.checkpoint_writer.wait()
+        
+        # Evaluates found_path and final_cost with eval2()
+        found_path, eval_cost = self.eval2()
+        self.converged_at = converged_n
+        if self.instrumentation is not None:
+            self.instrumentation.end_run(self)
+        print("==== " + self.name + " ====")
+        print("Final Path: " + str(found_path))
+        print("Total Distance: " + str(eval_cost))
+        print("Converged at (process killed at): " + str(converged_n))
+        if self.stopped_by is not None:
+            print("Stopped by: " + self.stopped_by)
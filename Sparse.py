@@ -0,0 +1,132 @@
+from Symmetric import MatrixIndexing
+import numpy as np
+
+class SparsePheramones(MatrixIndexing):
+    def __init__(self, num_cities, neighbours, initial=1.0, dtype=np.float64):
+        """ Constructor for SparsePheramones, symmetric pheramones with explicit values only where they differ
+
+        Candidate edges and every edge a deposit touched have their own cell, all other edges share one
+        baseline cell. Everything lives in one flat array, data[0] being the baseline, so decay, flooring and
+        clipping apply to explicit and implicit edges alike and the stored values stay exactly what a dense
+        matrix would hold.
+
+        Args:
+            num_cities: Number of cities in the graph
+            neighbours: (n x k) candidate lists, their edges are given cells up front
+            initial: Starting pheramone level of every edge. Defaults to 1.0.
+            dtype: Floating point type of the values. Defaults to np.float64.
+        """
+        self.num_cities = num_cities
+        self.shape = (num_cities, num_cities)
+        self.dtype = np.dtype(dtype)
+
+        rows = np.repeat(np.arange(num_cities), neighbours.shape[1])
+        # Sorted canonical keys of the candidate edges, then of the edges only a deposit has touched
+        self.keys = np.unique(self.edge_keys(rows, neighbours.ravel()))
+        self.extra_keys = np.empty(0, dtype=np.int64)
+        self.data = np.full(1 + len(self.keys), initial, dtype=self.dtype)
+
+
+    def __len__(self):
+        return self.num_cities
+
+
+    def __repr__(self):
+        return ("SparsePheramones(" + str(self.num_cities) + " cities, " + str(len(self.data) - 1)
+                + " explicit edges, baseline " + str(self.data[0]) + ")")
+
+
+    def edge_keys(self, rows, cols):
+        """ Canonical key of every (row, col) pair, the same in both directions
+
+        Args:
+            rows: Array of row indices
+            cols: Array of column indices, broadcast against rows
+
+        Returns:
+            keys: Array of int64 keys
+        """
+        low = np.minimum(rows, cols).astype(np.int64)
+        high = np.maximum(rows, cols)
+        return low * self.num_cities + high
+
+
+    def locate(self, keys):
+        """ Cell of every edge key, 0 (the baseline) for edges without one
+
+        Args:
+            keys: Array of edge keys
+
+        Returns:
+            cells: Array of positions in data
+        """
+        cells = np.zeros(keys.shape, dtype=np.int64)
+        for offset, stored in ((1, self.keys), (1 + len(self.keys), self.extra_keys)):
+            if len(stored) == 0:
+                continue
+            positions = np.minimum(np.searchsorted(stored, keys), len(stored) - 1)
+            found = stored[positions] == keys
+            cells[found] = offset + positions[found]
+        return cells
+
+
+    def insert(self, keys):
+        """ Gives edges their own cell at the baseline level, dropping deposited edges that are back at it
+
+        Args:
+            keys: Array of edge keys not stored yet
+        """
+        baseline = self.data[0]
+        num_candidates = len(self.keys)
+        extra_values = self.data[1 + num_candidates:]
+        # Edges clipped back to the baseline (e.g. the MMAS minimum) no longer need a cell
+        keep = extra_values != baseline
+
+        new_keys = np.unique(keys)
+        merged_keys = np.concatenate((self.extra_keys[keep], new_keys))
+        merged_values = np.concatenate((extra_values[keep], np.full(len(new_keys), baseline, dtype=self.dtype)))
+        order = np.argsort(merged_keys, kind="stable")
+        self.extra_keys = merged_keys[order]
+        self.data = np.concatenate((self.data[:1 + num_candidates], merged_values[order]))
+
+
+    def cells(self, rows, cols):
+        """ Cells of (row, col) pairs, inserting the edges that do not have one yet
+
+        Args:
+            rows: Array of row indices
+            cols: Array of column indices
+
+        Returns:
+            cells: Array of positions in data
+        """
+        keys = self.edge_keys(np.asarray(rows), np.asarray(cols))
+        cells = self.locate(keys)
+        missing = cells == 0
+        if missing.any():
+            self.insert(keys[missing])
+            cells = self.locate(keys)
+        return cells
+
+
+    def __getitem__(self, key):
+        return self.data[self.locate(self.edge_keys(*self.index_arrays(key)))]
+
+
+    def __setitem__(self, key, values):
+        rows, cols = key
+        # Located first, inserting edges reallocates data
+        cells = self.cells(rows, cols)
+        self.data[cells] = values
+
+
+    def add_at(self, rows, cols, values):
+        """ Unbuffered in-place addition, repeated pairs accumulate like np.add.at
+
+        Args:
+            rows: Array of row indices
+            cols: Array of column indices
+            values: Amounts added to each (row, col) edge
+        """
+        cells = self.cells(rows, cols)
+        np.add.at(self.data, cells, values)
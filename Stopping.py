@@ -0,0 +1,242 @@
+import numpy as np
+import time
+
+def canonical_tours(paths, symmetric=True):
+    """ Rewrites closed paths so the same cycle always reads the same, whatever its start (or direction)
+
+    Args:
+        paths: (ants x n+1) matrix of closed paths
+        symmetric: Whether a cycle and its reverse are the same tour, only true when both directions cost the same.
+            Defaults to True.
+
+    Returns:
+        tours: (ants x n) matrix of cycles starting at city 0, for symmetric tours heading to the smaller of its
+            two neighbours
+    """
+    cycles = np.asarray(paths)[:, :-1]
+    num_cities = cycles.shape[1]
+    # Rotated so every cycle starts at city 0
+    offsets = np.argmax(cycles == 0, axis=1)
+    tours = np.take_along_axis(cycles, (offsets[:, None] + np.arange(num_cities)) % num_cities, axis=1)
+    if symmetric:
+        # Reversed so every cycle leaves city 0 the same way
+        backwards = tours[:, 1] > tours[:, -1]
+        tours[backwards, 1:] = tours[backwards, :0:-1]
+    return tours
+
+
+def tour_counts(paths, symmetric=True):
+    """ Number of ants on each distinct tour
+
+    Args:
+        paths: (ants x n+1) matrix of closed paths
+        symmetric: Whether a cycle and its reverse count as the same tour. Defaults to True.
+
+    Returns:
+        counts: Array of ant counts, one per distinct tour
+    """
+    return np.unique(canonical_tours(paths, symmetric), axis=0, return_counts=True)[1]
+
+
+def branching_factor(pheramones, neighbours=None, lower=None, spread=0.05, block_size=1024):
+    """ Average lambda-branching factor: edges per city whose pheramone is within the top (1 - spread) of its range
+
+    Close to 2 once a symmetric colony has settled on a single tour, as many as there are choices at the start.
+
+    Args:
+        pheramones: Adjacency matrix (or SymmetricMatrix / SparsePheramones) representing graph pheramones
+        neighbours: Candidate lists, only their edges are counted. Defaults to None (every edge).
+        lower: Lower bound applied to pheramones as they are read. Defaults to None.
+        spread: Fraction of each city's pheramone range above its minimum an edge has to clear. Defaults to 0.05.
+        block_size: Number of cities processed at once to bound temporary memory. Defaults to 1024.
+
+    Returns:
+        branching: Average number of branches per city
+    """
+    num_cities = len(pheramones)
+    branches = 0
+    for start in range(0, num_cities, block_size):
+        rows = np.arange(start, min(start + block_size, num_cities))
+        if neighbours is None:
+            values = np.array(pheramones[rows], dtype=np.float64)
+            # A city is not its own branch
+            values[np.arange(len(rows)), rows] = np.nan
+        else:
+            values = np.array(pheramones[rows[:, None], neighbours[rows]], dtype=np.float64)
+        if lower is not None:
+            values = np.maximum(values, lower)
+
+        low = np.nanmin(values, axis=1)
+        cutoff = low + spread * (np.nanmax(values, axis=1) - low)
+        branches += np.count_nonzero(values >= cutoff[:, None])
+    return branches / num_cities
+
+
+class StoppingCriterion:
+    """ Decides after every epoch whether a run is worth continuing, solvers stop as soon as any criterion fires
+    """
+    def start(self, solver):
+        """ Resets the criterion before a run
+
+        Args:
+            solver: Solver about to run
+        """
+        pass
+
+
+    def should_stop(self, solver):
+        """ Checks the criterion after an epoch, every criterion is checked every epoch so counters stay current
+
+        Args:
+            solver: Solver that has just run an epoch
+
+        Returns:
+            stop: Whether further epochs are not worth running
+        """
+        raise NotImplementedError
+
+
+class TourAgreement(StoppingCriterion):
+    """ Stops once most ants construct the very same tour
+    """
+    def __init__(self, fraction=0.9):
+        """ Constructor for TourAgreement
+
+        Args:
+            fraction: Share of the colony the most common tour has to exceed. Defaults to 0.9.
+        """
+        self.fraction = fraction
+
+
+    def should_stop(self, solver):
+        # Compared by tour rather than cost, distinct tours can share a cost
+        # On asymmetric instances a tour and its reverse differ in cost, so they only match when the solver says so
+        return tour_counts(solver.paths, solver.reversible).max() > self.fraction * len(solver.paths)
+
+
+class TourEntropy(StoppingCriterion):
+    """ Stops once the spread of tours across the colony has collapsed
+    """
+    def __init__(self, threshold=0.1):
+        """ Constructor for TourEntropy
+
+        Args:
+            threshold: Entropy of the colony's tours, normalised to 1 when every ant's tour differs,
+                at or below which the run stops. Defaults to 0.1.
+        """
+        self.threshold = threshold
+
+
+    def should_stop(self, solver):
+        if len(solver.paths) < 2:
+            return True
+        share = tour_counts(solver.paths, solver.reversible) / len(solver.paths)
+        return -np.sum(share * np.log(share)) / np.log(len(solver.paths)) <= self.threshold
+
+
+class Stagnation(StoppingCriterion):
+    """ Stops once the global best has not improved for a window of epochs
+    """
+    def __init__(self, window=50):
+        """ Constructor for Stagnation
+
+        Args:
+            window: Number of epochs without improvement after which the run stops. Defaults to 50.
+        """
+        self.window = window
+        self.best = None
+        self.stale = 0
+
+
+    def start(self, solver):
+        self.best = solver.current_best_dis
+        self.stale = 0
+
+
+    def should_stop(self, solver):
+        if self.best is None or solver.current_best_dis < self.best:
+            self.best = solver.current_best_dis
+            self.stale = 0
+        else:
+            self.stale += 1
+        return self.stale >= self.window
+
+
+class BranchingFactor(StoppingCriterion):
+    """ Stops once the pheramones leave about as many attractive edges per city as a single tour has
+
+    Right after the uniform start a single deposit already stands out from every other edge, so like the reference
+    MMAS restart test the branching factor is only consulted once the global best has stalled as well.
+    """
+    def __init__(self, threshold=2.0, spread=0.05, window=20):
+        """ Constructor for BranchingFactor
+
+        Args:
+            threshold: Average lambda-branching factor at or below which the run stops. Defaults to 2.0.
+            spread: Lambda, see branching_factor. Defaults to 0.05.
+            window: Number of epochs without improvement before the branching factor is computed. Defaults to 20.
+        """
+        self.threshold = threshold
+        self.spread = spread
+        self.stagnation = Stagnation(window)
+
+
+    def start(self, solver):
+        self.stagnation.start(solver)
+
+
+    def should_stop(self, solver):
+        if not self.stagnation.should_stop(solver):
+            return False
+        # Counted over the candidate lists when there are some, like the reference MMAS implementation
+        return branching_factor(solver.pheramones, solver.colony.neighbours, solver.stored_lower_bound,
+                                self.spread) <= self.threshold
+
+
+class TimeBudget(StoppingCriterion):
+    """ Stops once a run has used up its wall-clock budget
+    """
+    def __init__(self, seconds):
+        """ Constructor for TimeBudget
+
+        Args:
+            seconds: Wall-clock seconds a run may take
+        """
+        self.seconds = seconds
+        self.started = time.perf_counter()
+
+
+    def start(self, solver):
+        self.started = time.perf_counter()
+
+
+    def should_stop(self, solver):
+        return time.perf_counter() - self.started >= self.seconds
+
+
+    def __getstate__(self):
+        # perf_counter means nothing in another process, a resumed run gets the remaining budget
+        state = self.__dict__.copy()
+        state["started"] = time.perf_counter() - self.started
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.started = time.perf_counter() - state["started"]
+
+
+class TargetCost(StoppingCriterion):
+    """ Stops once a tour at least as good as a target has been found, e.g. a known optimum
+    """
+    def __init__(self, cost):
+        """ Constructor for TargetCost
+
+        Args:
+            cost: Tour cost to reach
+        """
+        self.cost = cost
+
+
+    def should_stop(self, solver):
+        return solver.current_best_dis <= self.cost
@@ -0,0 +1,159 @@
+from Symmetric import storage
+import numpy as np
+
+def nearest_neighbour_cost(distances, start=0):
+    """ Cost of the greedy nearest neighbour tour, the usual yardstick for initial pheramone levels
+
+    Args:
+        distances: Adjacency matrix representing graph distances
+        start: Starting city. Defaults to 0.
+
+    Returns:
+        total_distance: Total cost of the greedy tour
+    """
+    unvisited = np.ones(len(distances), dtype=bool)
+    unvisited[start] = False
+    current = start
+    total_distance = 0
+    for n in range(0, len(distances) - 1):
+        row = np.where(unvisited, distances[current], np.inf)
+        next_node = np.argmin(row)
+        total_distance += row[next_node]
+        unvisited[next_node] = False
+        current = next_node
+    return total_distance + distances[current, start]
+
+
+def closed_path(path):
+    """ Closed path of a tour in found_path order
+
+    Args:
+        path: Visited cities ending back at the starting position
+
+    Returns:
+        paths: (1 x n+1) matrix starting and ending at the starting position
+    """
+    # found_path ends at its start so the last city is where the tour begins
+    return np.concatenate(([path[-1]], path))[None, :]
+
+
+class AllAntsUpdate:
+    """ Ant System: every ant deposits Q / cost along its tour, then every edge evaporates
+    """
+    def prepare(self, solver):
+        """ Adjusts the freshly initialised solver, e.g. its starting pheramone level
+
+        Args:
+            solver: Solver that has just been constructed
+        """
+        pass
+
+
+    def bounds(self):
+        """ Lower and upper bound of the true pheramone levels, applied lazily by the solver
+
+        Returns:
+            lower, upper: Bounds, None when unbounded
+        """
+        return None, None
+
+
+    def deposit(self, solver):
+        """ Deposits pheramones after the epoch's tours have been evaluated
+
+        Args:
+            solver: Solver whose pheramones are updated in place
+        """
+        solver.deposit_pheramones(solver.paths, solver.dropoff_rate / solver.costs)
+
+
+    def decay(self, solver):
+        """ Evaporates pheramones at the end of the epoch
+
+        Args:
+            solver: Solver whose pheramones are updated in place
+        """
+        # Only the global scale changes, stored pheramones are left alone
+        solver.evaporate(solver.decay_rate)
+
+
+class ElitistUpdate(AllAntsUpdate):
+    """ Elitist AS as used by EAS_TSP: only the epoch's best ant deposits
+    """
+    def deposit(self, solver):
+        # The last ant with the lowest cost is the local best ant
+        best_index = len(solver.costs) - 1 - np.argmin(solver.costs[::-1])
+        solver.deposit_pheramones(solver.paths[best_index:best_index + 1], [solver.dropoff_rate / solver.costs[best_index]])
+
+
+class MinMaxUpdate(ElitistUpdate):
+    """ MAX-MIN AS: the best ant deposits and pheramones are kept within [min, max]
+    """
+    def __init__(self, min=0.00000001, max=100000000):
+        """ Constructor for MinMaxUpdate
+
+        Args:
+            min: Lower pheramone bound. Defaults to 0.00000001.
+            max: Upper pheramone bound. Defaults to 100000000.
+        """
+        self.min = min
+        self.max = max
+
+
+    def bounds(self):
+        # Evaporation is lazy, so the bounds are applied as pheramones are read and deposited
+        return self.min, self.max
+
+
+    def clip(self, solver):
+        """ Rebounds pheramones back to maximum and minimum on every edge at once
+
+        Args:
+            solver: Solver whose pheramones are updated in place
+        """
+        solver.renormalise()
+
+
+class RankUpdate(AllAntsUpdate):
+    """ Rank-based AS: the best w-1 ants deposit weighted by rank, plus the best-so-far tour with weight w
+    """
+    def __init__(self, weight=6):
+        """ Constructor for RankUpdate
+
+        Args:
+            weight: Number of ranks w. Defaults to 6.
+        """
+        self.weight = weight
+
+
+    def deposit(self, solver):
+        ranked = np.argsort(solver.costs, kind="stable")[:self.weight - 1]
+        amounts = (self.weight - 1 - np.arange(len(ranked))) * solver.dropoff_rate / solver.costs[ranked]
+        solver.deposit_pheramones(solver.paths[ranked], amounts)
+
+        solver.deposit_pheramones(closed_path(solver.current_best_path),
+                                  [self.weight * solver.dropoff_rate / solver.current_best_dis])
+
+
+class ACSUpdate(AllAntsUpdate):
+    """ Ant Colony System global rule: only the best-so-far tour's edges evaporate and receive pheramones,
+        tau = (1 - rho) * tau + rho * Q / cost with rho = 1 - decay_rate
+    """
+    def prepare(self, solver):
+        # Pheramones start at tau0 = Q / (n * C_nn) so deposits of Q / cost actually reinforce
+        tau0 = solver.dropoff_rate / (len(solver.distances) * nearest_neighbour_cost(solver.distances))
+        storage(solver.pheramones).fill(tau0 / solver.pheramone_scale)
+
+
+    def deposit(self, solver):
+        best_path = closed_path(solver.current_best_path)
+        rho = 1 - solver.decay_rate
+        # A tour never repeats an edge so plain assignment is enough
+        updated = (1 - rho) * solver.edge_pheramones(best_path) + rho * solver.dropoff_rate / solver.current_best_dis
+        solver.set_edge_pheramones(best_path, updated)
+
+
+    def decay(self, solver):
+        # Evaporation already happened on the best tour's edges only, and there is no upper bound to apply
+        solver.deposited_paths = []
+
@@ -0,0 +1,193 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import numpy as np
+import csv
+import io
+import itertools
+import json
+import random
+import time
+
+# Parameters every sweep can vary, min/max_pheramone only apply to MMAS_TSP
+SWEEP_PARAMETERS = ["max_epoch", "num_ants", "decay_rate", "dropoff_rate", "alpha", "beta", "q0", "min_pheramone",
+                    "max_pheramone"]
+
+
+def expand_grid(grid):
+    """ Every combination of a parameter grid
+
+    Args:
+        grid: Dict of parameter name to list of values
+
+    Returns:
+        points: List of dicts, one per combination
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(list(grid[name]) for name in names))]
+
+
+def sample_space(space, samples, seed=0):
+    """ Random search points drawn from a parameter space
+
+    Args:
+        space: Dict of parameter name to either a list of choices or a (low, high) tuple.
+            Tuples of ints are sampled as ints, anything else uniformly as floats.
+        samples: Number of points to draw
+        seed: Seed of the sampler. Defaults to 0.
+
+    Returns:
+        points: List of dicts, one per sample
+    """
+    rng = np.random.default_rng(seed)
+    points = []
+    for n in range(0, samples):
+        point = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    point[name] = int(rng.integers(low, high + 1))
+                else:
+                    point[name] = float(rng.uniform(low, high))
+            else:
+                point[name] = values[rng.integers(len(values))]
+        points.append(point)
+    return points
+
+
+def solver_points(solver_class, points):
+    """ Sweep points reduced to the parameters a solver takes, without repeats
+
+    Args:
+        solver_class: ACO_TSP, EAS_TSP or MMAS_TSP
+        points: List of parameter dicts
+
+    Returns:
+        points: List of distinct parameter dicts in their first order, e.g. ACO_TSP runs a min_pheramone grid once
+    """
+    accepted = solver_class.accepted_parameters()
+    reduced = {}
+    for params in points:
+        params = {name: value for name, value in params.items() if name in accepted}
+        reduced.setdefault(repr(sorted(params.items())), params)
+    return list(reduced.values())
+
+
+def run_point(solver_class, graph_path, params, seed, solver_kwargs, keep_path=False):
+    """ Solves one sweep point in a worker process
+
+    Args:
+        solver_class: ACO_TSP, EAS_TSP or MMAS_TSP
+        graph_path: Path of the graph to solve
+        params: Dict of swept parameters, ones the solver does not take are ignored
+        seed: Seed for random and np.random
+        solver_kwargs: Fixed keyword arguments for solver_class
+        keep_path: Also record the best tour found. Defaults to False.
+
+    Returns:
+        row: Dict describing the run and its result
+    """
+    accepted = solver_class.accepted_parameters()
+    kwargs = dict(solver_kwargs)
+    kwargs.update({name: value for name, value in params.items() if name in accepted})
+
+    random.seed(seed)
+    np.random.seed(seed)
+    np.seterr(divide='ignore')
+    start = time.perf_counter()
+    # The solvers report to stdout, which would interleave across workers
+    with redirect_stdout(io.StringIO()):
+        solver = solver_class(graph_path=graph_path, **kwargs)
+        solver.run()
+
+    row = {"solver": solver_class.__name__, "graph": graph_path, "seed": seed}
+    for name in SWEEP_PARAMETERS:
+        # Unswept parameters are recorded at the solver's default, ones it does not take are left blank
+        row[name] = kwargs.get(name, accepted.get(name))
+    row["best_dis"] = float(solver.current_best_dis)
+    row["converged_at"] = solver.converged_at
+    row["stopped_by"] = solver.stopped_by
+    row["seconds"] = time.perf_counter() - start
+    if keep_path:
+        row["best_path"] = [int(city) for city in solver.current_best_path]
+    return row
+
+
+def write_table(rows, output_path):
+    """ Writes results as CSV, as JSON or JSON lines when the path ends in .json / .jsonl,
+        or as Parquet when it ends in .parquet and pandas is installed
+
+    Args:
+        rows: List of result dicts, CSV columns are every key that appears in any of them
+        output_path: Path of the table to write
+    """
+    if output_path.endswith(".json") or output_path.endswith(".jsonl"):
+        with open(output_path, "w") as file:
+            if output_path.endswith(".json"):
+                json.dump(rows, file, indent=2)
+            else:
+                file.writelines(json.dumps(row) + "\n" for row in rows)
+        return
+
+    if output_path.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError("Writing Parquet needs pandas (and pyarrow), write to a .csv path instead")
+        pd.DataFrame(rows).to_parquet(output_path)
+        return
+
+    with open(output_path, "w", newline="") as file:
+        # Rows may differ in their keys, e.g. failed runs of a batch carry an error instead of results
+        writer = csv.DictWriter(file, fieldnames=list(dict.fromkeys(name for row in rows for name in row)))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_sweep(solver_classes, graph_path, grid=None, space=None, samples=20, seeds=(1, 2, 3),
+              output_path="sweep.csv", processes=None, **solver_kwargs):
+    """ Runs a grid or random parameter search over one or more solvers on a pool of processes
+
+    Every point is solved once per seed, each run gets a fresh solver so no state leaks between runs.
+    Points are reduced to the parameters each solver takes first, so no solver runs the same settings twice.
+
+    Args:
+        solver_classes: List of solver classes, e.g. [ACO_TSP, EAS_TSP, MMAS_TSP]
+        graph_path: Path of the graph to solve
+        grid: Dict of parameter name to list of values, every combination is run. Defaults to None.
+        space: Dict for random search, see sample_space. Used when grid is None. Defaults to None.
+        samples: Number of random search points. Defaults to 20.
+        seeds: Seeds run for every point. Defaults to (1, 2, 3).
+        output_path: CSV or Parquet file the results are written to. Defaults to "sweep.csv".
+        processes: Number of worker processes. Defaults to the number of CPUs.
+        **solver_kwargs: Fixed keyword arguments for every solver, e.g. candidate_size
+
+    Returns:
+        rows: List of result dicts, also written to output_path
+    """
+    if grid is not None:
+        points = expand_grid(grid)
+    elif space is not None:
+        points = sample_space(space, samples)
+    else:
+        raise ValueError("run_sweep needs either a grid or a space")
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        # Points differing only in parameters a solver does not take would repeat the same run
+        futures = [pool.submit(run_point, solver_class, graph_path, params, seed, solver_kwargs)
+                   for solver_class in solver_classes for params in solver_points(solver_class, points)
+                   for seed in seeds]
+        rows = [future.result() for future in futures]
+
+    write_table(rows, output_path)
+    return rows
+
+
+if __name__ == "__main__":
+    from ACO_TSP import ACO_TSP
+    from EAS_TSP import EAS_TSP
+    from MMAS_TSP import MMAS_TSP
+    graph_path = "./TSPLIB_XML/" + input("Graph name here (Graphs stored in ./TSPLIB_XML): ")
+    print("")
+    run_sweep([ACO_TSP, EAS_TSP, MMAS_TSP], graph_path,
+              grid={"max_epoch": [50, 100, 200], "num_ants": [20, 40, 100], "decay_rate": [0.5, 0.9]})
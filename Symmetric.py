@@ -0,0 +1,192 @@
+import numpy as np
+
+def packed_size(num_cities):
+    """ Number of cells in the upper triangle of a matrix, diagonal included
+
+    Args:
+        num_cities: Number of cities
+
+    Returns:
+        size: n * (n + 1) / 2
+    """
+    return num_cities * (num_cities + 1) // 2
+
+
+def is_symmetric(matrix, block_size=1024):
+    """ Whether a square matrix equals its transpose, compared a block of rows at a time
+
+    Args:
+        matrix: NumPy adjacency matrix
+        block_size: Number of rows compared at once to bound temporary memory. Defaults to 1024.
+
+    Returns:
+        symmetric: True if every cell matches its mirror
+    """
+    for start in range(0, len(matrix), block_size):
+        rows = slice(start, start + block_size)
+        if not np.array_equal(matrix[rows], matrix[:, rows].T):
+            return False
+    return True
+
+
+def pack_upper(matrix):
+    """ Copies the upper triangle of a matrix, diagonal included, into a flat array row by row
+
+    Args:
+        matrix: Square NumPy adjacency matrix
+
+    Returns:
+        data: Flat NumPy array of packed_size(n) cells
+    """
+    num_cities = len(matrix)
+    data = np.empty(packed_size(num_cities), dtype=matrix.dtype)
+    start = 0
+    for row in range(0, num_cities):
+        data[start:start + num_cities - row] = matrix[row, row:]
+        start += num_cities - row
+    return data
+
+
+def pack_if_symmetric(matrix):
+    """ Packs symmetric dense matrices, anything else is returned as it is
+
+    Args:
+        matrix: NumPy adjacency matrix, or a lazily computed graph
+
+    Returns:
+        matrix: Flat packed upper triangle if matrix was a symmetric ndarray, otherwise matrix itself
+    """
+    if isinstance(matrix, np.ndarray) and matrix.ndim == 2 and is_symmetric(matrix):
+        return pack_upper(matrix)
+    return matrix
+
+
+def storage(matrix):
+    """ Array actually holding a matrix's cells, for element-wise updates such as decay or clipping
+
+    Args:
+        matrix: NumPy adjacency matrix, SymmetricMatrix or SparsePheramones
+
+    Returns:
+        cells: The ndarray itself, or the flat cells of a packed or sparse matrix
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix
+    return matrix.data
+
+
+class MatrixIndexing:
+    """ NumPy-style indexing shared by matrices that are not held as a full ndarray
+        (SymmetricMatrix, SparsePheramones, CoordinateDistances)
+
+    Subclasses provide __len__, shape, dtype and a __getitem__ built on index_arrays.
+    """
+    def index_arrays(self, key):
+        """ Row and column index arrays of a key, as NumPy would read it
+
+        Supports a row, a block of rows, and paired row/column arrays.
+
+        Args:
+            key: Index as passed to __getitem__
+
+        Returns:
+            rows, cols: Broadcastable NumPy arrays of row and column indices
+        """
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(rows, slice):
+            rows = np.arange(len(self))[rows]
+        if isinstance(cols, slice):
+            # Mirrors NumPy, an indexed row dimension followed by every column
+            rows = np.asarray(rows)[..., None]
+            cols = np.arange(len(self))[cols]
+        return np.asarray(rows), np.asarray(cols)
+
+
+    def __array__(self, dtype=None, copy=None):
+        """ Materialises the full matrix block by block
+        """
+        dense = np.empty(self.shape, dtype=dtype or self.dtype)
+        for start in range(0, len(self), 1024):
+            dense[start:start + 1024] = self[start:start + 1024]
+        return dense
+
+
+class SymmetricMatrix(MatrixIndexing):
+    def __init__(self, data):
+        """ Constructor for SymmetricMatrix, a symmetric matrix stored as its packed upper triangle
+
+        Every edge has a single canonical cell, so memory and updates are roughly halved.
+        Supports the indexing the solvers use on NumPy matrices: a single cell, a row, a block of rows,
+        and paired row/column arrays.
+
+        Args:
+            data: Flat NumPy array of the upper triangle, diagonal included, row by row (see pack_upper)
+        """
+        self.data = data
+        num_cities = int((np.sqrt(8 * len(data) + 1) - 1) / 2)
+        if packed_size(num_cities) != len(data):
+            raise ValueError("Packed data of length " + str(len(data)) + " is not a triangle")
+        self.num_cities = num_cities
+        self.shape = (num_cities, num_cities)
+        self.dtype = data.dtype
+
+
+    def __len__(self):
+        return self.num_cities
+
+
+    def __repr__(self):
+        return "SymmetricMatrix(" + str(self.num_cities) + " cities, " + str(self.dtype) + ")"
+
+
+    def index(self, rows, cols):
+        """ Canonical cell of every (row, col) pair
+
+        Args:
+            rows: Array of row indices
+            cols: Array of column indices, broadcast against rows
+
+        Returns:
+            cells: Array of positions in data
+        """
+        low = np.minimum(rows, cols).astype(np.int64)
+        high = np.maximum(rows, cols)
+        # Packed row i starts after the n, n-1, ..., n-i+1 cells of the rows above it
+        return low * (2 * self.num_cities - low + 1) // 2 + (high - low)
+
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        # Single cells are the hot path of local search, kept in plain Python arithmetic
+        if isinstance(rows, (int, np.integer)) and isinstance(cols, (int, np.integer)):
+            low, high = (int(rows), int(cols)) if rows <= cols else (int(cols), int(rows))
+            return self.data[low * (2 * self.num_cities - low + 1) // 2 + high - low]
+        return self.data[self.index(*self.index_arrays(key))]
+
+
+    def __setitem__(self, key, values):
+        rows, cols = key
+        self.data[self.index(np.asarray(rows), np.asarray(cols))] = values
+
+
+    def add_at(self, rows, cols, values):
+        """ Unbuffered in-place addition, repeated pairs accumulate like np.add.at
+
+        Args:
+            rows: Array of row indices
+            cols: Array of column indices
+            values: Amounts added to each (row, col) cell
+        """
+        np.add.at(self.data, self.index(np.asarray(rows), np.asarray(cols)), values)
+
+
+    def reciprocal(self):
+        """ Visibility counterpart of this matrix
+
+        Returns:
+            visibilities: SymmetricMatrix of 1/distance, zero where the distance is zero
+        """
+        with np.errstate(divide="ignore"):
+            values = 1 / self.data
+        values[np.isinf(values)] = 0
+        return SymmetricMatrix(values)
@@ -0,0 +1,393 @@
+from Symmetric import MatrixIndexing
+import numpy as np
+import math
+import xml.etree.ElementTree as ET
+
+def round_significant(values, digits):
+    """ Rounds values to a number of significant digits
+
+    Args:
+        values: NumPy array of values
+        digits: Number of significant digits to keep
+
+    Returns:
+        rounded: NumPy array of rounded values
+    """
+    magnitude = np.zeros_like(values)
+    nonzero = values != 0
+    magnitude[nonzero] = np.floor(np.log10(np.abs(values[nonzero])))
+    scale = np.power(10.0, digits - 1 - magnitude)
+    return np.round(values * scale) / scale
+
+
+def parse_xml(path, dtype=np.float64):
+    """ Streams a TSPLIB XML file into an adjacency matrix without building a DOM
+
+    Elements are cleared as soon as their vertex has been read, so memory stays at the size of the matrix.
+    Costs are rounded to doublePrecision - ignoredDigits significant digits when the header provides them.
+
+    Args:
+        path: File path for XML file
+        dtype: Floating point type of the matrix. Defaults to np.float64.
+
+    Returns:
+        adj_matrix: NumPy adjacency matrix representing the graph
+    """
+    adj_matrix = None
+    graph = None
+    precision = None
+    ignored_digits = 0
+    row_index = 0
+
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            # Kept to drop every vertex once it has been copied into the matrix
+            if elem.tag == "graph":
+                graph = elem
+            continue
+
+        if elem.tag == "doublePrecision":
+            precision = int(elem.text)
+        elif elem.tag == "ignoredDigits":
+            ignored_digits = int(elem.text)
+        elif elem.tag == "vertex":
+            # The content of each edge is the column index, its cost attribute the distance
+            columns = np.fromiter((edge.text for edge in elem), dtype=np.int64, count=len(elem))
+            costs = np.fromiter((edge.get("cost") for edge in elem), dtype=np.float64, count=len(elem))
+            if precision is not None:
+                costs = round_significant(costs, precision - ignored_digits)
+
+            # The graph is complete so the first vertex gives the size of the matrix
+            if adj_matrix is None:
+                adj_matrix = np.zeros(shape=(len(columns) + 1, len(columns) + 1), dtype=dtype)
+
+            # Whole vertex assigned at once
+            adj_matrix[columns, row_index] = costs
+            row_index += 1
+            graph.clear()
+
+    return adj_matrix
+
+
+# Graphs with more cities than this get their distances computed row by row on demand
+DENSE_LIMIT = 5000
+
+# Constants fixed by the TSPLIB specification for GEO instances
+GEO_PI = 3.141592
+GEO_RADIUS = 6378.388
+
+
+def nint(values):
+    """ TSPLIB nearest integer rounding, (int)(x + 0.5)
+
+    Args:
+        values: NumPy array of non-negative values
+
+    Returns:
+        rounded: NumPy array of rounded values
+    """
+    return np.floor(values + 0.5)
+
+
+def geo_radians(values):
+    """ Converts TSPLIB DDD.MM coordinates into radians
+
+    Args:
+        values: NumPy array of coordinates in degrees.minutes
+
+    Returns:
+        radians: NumPy array of coordinates in radians
+    """
+    degrees = np.trunc(values)
+    minutes = values - degrees
+    return GEO_PI * (degrees + 5.0 * minutes / 3.0) / 180.0
+
+
+def euc_2d(a, b):
+    """ Rounded euclidean distance between broadcastable arrays of coordinates
+    """
+    return nint(np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1]))
+
+
+def ceil_2d(a, b):
+    """ Euclidean distance rounded up between broadcastable arrays of coordinates
+    """
+    return np.ceil(np.hypot(a[..., 0] - b[..., 0], a[..., 1] - b[..., 1]))
+
+
+def att(a, b):
+    """ Pseudo-euclidean distance between broadcastable arrays of coordinates
+    """
+    exact = np.sqrt(((a[..., 0] - b[..., 0]) ** 2 + (a[..., 1] - b[..., 1]) ** 2) / 10.0)
+    rounded = nint(exact)
+    return np.where(rounded < exact, rounded + 1, rounded)
+
+
+def geo(a, b):
+    """ Geographical distance between broadcastable arrays of coordinates already converted by geo_radians
+    """
+    q1 = np.cos(a[..., 1] - b[..., 1])
+    q2 = np.cos(a[..., 0] - b[..., 0])
+    q3 = np.cos(a[..., 0] + b[..., 0])
+    # Clipped so floating point error never leaves the domain of arccos
+    cosine = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    return np.trunc(GEO_RADIUS * np.arccos(cosine) + 1.0)
+
+
+def euc_2d_pair(ax, ay, bx, by):
+    """ euc_2d between two single cities in plain Python arithmetic
+    """
+    return math.floor(math.hypot(ax - bx, ay - by) + 0.5)
+
+
+def ceil_2d_pair(ax, ay, bx, by):
+    """ ceil_2d between two single cities in plain Python arithmetic
+    """
+    return math.ceil(math.hypot(ax - bx, ay - by))
+
+
+def att_pair(ax, ay, bx, by):
+    """ att between two single cities in plain Python arithmetic
+    """
+    exact = math.sqrt(((ax - bx) ** 2 + (ay - by) ** 2) / 10.0)
+    rounded = math.floor(exact + 0.5)
+    return rounded + 1 if rounded < exact else rounded
+
+
+def geo_pair(ax, ay, bx, by):
+    """ geo between two single cities in plain Python arithmetic, coordinates already converted by geo_radians
+    """
+    q1 = math.cos(ay - by)
+    q2 = math.cos(ax - bx)
+    q3 = math.cos(ax + bx)
+    cosine = min(max(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0), 1.0)
+    return math.trunc(GEO_RADIUS * math.acos(cosine) + 1.0)
+
+
+METRICS = {
+    "EUC_2D": euc_2d,
+    "CEIL_2D": ceil_2d,
+    "ATT": att,
+    "GEO": geo,
+}
+
+# Single cell counterparts of the metrics, lookups one edge at a time (e.g. local search) cost ~0.2us instead of ~15us
+PAIR_METRICS = {
+    euc_2d: euc_2d_pair,
+    ceil_2d: ceil_2d_pair,
+    att: att_pair,
+    geo: geo_pair,
+}
+
+
+class CoordinateDistances(MatrixIndexing):
+    def __init__(self, coords, metric, reciprocal=False, dtype=np.float64):
+        """ Distance matrix defined by city coordinates, computed only for the cells that are indexed
+
+        Supports the indexing the solvers use on NumPy matrices: a row, a block of rows, and paired row/column arrays.
+
+        Args:
+            coords: (n x 2) NumPy array of coordinates
+            metric: Distance function from METRICS
+            reciprocal: Whether cells hold 1/distance (visibility) instead of distance. Defaults to False.
+            dtype: Floating point type of the returned cells, always computed in float64. Defaults to np.float64.
+        """
+        self.coords = coords
+        self.metric = metric
+        self.is_reciprocal = reciprocal
+        self.shape = (len(coords), len(coords))
+        self.dtype = np.dtype(dtype)
+        self.pair_metric = PAIR_METRICS.get(metric)
+        # Coordinates as a flat list of Python floats, built on the first single cell lookup
+        self.flat_coords = None
+
+
+    def __len__(self):
+        return len(self.coords)
+
+
+    def cell(self, row, col):
+        """ Single cell in plain Python arithmetic, matching the vectorised metric exactly
+
+        Args:
+            row: Row index
+            col: Column index
+
+        Returns:
+            value: Cell value as a scalar of the matrix's dtype
+        """
+        if self.flat_coords is None:
+            self.flat_coords = self.coords.ravel().tolist()
+        if row == col:
+            return self.dtype.type(0)
+        coords = self.flat_coords
+        value = float(self.pair_metric(coords[2 * row], coords[2 * row + 1], coords[2 * col], coords[2 * col + 1]))
+        if self.is_reciprocal:
+            value = 1 / value if value != 0 else 0.0
+        return self.dtype.type(value)
+
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        # Single cells are the hot path of local search, broadcasting arrays costs far more than the metric
+        if (self.pair_metric is not None and isinstance(rows, (int, np.integer))
+                and isinstance(cols, (int, np.integer))):
+            return self.cell(int(rows), int(cols))
+        rows, cols = np.broadcast_arrays(*self.index_arrays(key))
+
+        values = self.metric(self.coords[rows], self.coords[cols])
+        # Cities are zero distance from themselves, GEO would otherwise give 1
+        values = np.where(rows == cols, 0.0, values)
+
+        if self.is_reciprocal:
+            # Zero distance gives zero visibility rather than infinity
+            with np.errstate(divide="ignore"):
+                values = 1 / values
+            values[np.isinf(values)] = 0
+        return values.astype(self.dtype, copy=False)
+
+
+    def reciprocal(self):
+        """ Visibility counterpart of this matrix
+
+        Returns:
+            visibilities: CoordinateDistances giving 1/distance
+        """
+        return CoordinateDistances(self.coords, self.metric, reciprocal=True, dtype=self.dtype)
+
+
+def explicit_indices(weight_format, dimension):
+    """ Cells filled, in order, by each TSPLIB EDGE_WEIGHT_FORMAT
+
+    Args:
+        weight_format: EDGE_WEIGHT_FORMAT from the header
+        dimension: Number of cities
+
+    Returns:
+        rows, cols: NumPy arrays of matrix indices, or None for FULL_MATRIX
+    """
+    if weight_format == "FULL_MATRIX":
+        return None
+    # Column-wise upper layouts visit cells in the same order as row-wise lower layouts, mirrored
+    layouts = {
+        "UPPER_ROW": (np.triu_indices, 1, False),
+        "LOWER_ROW": (np.tril_indices, -1, False),
+        "UPPER_DIAG_ROW": (np.triu_indices, 0, False),
+        "LOWER_DIAG_ROW": (np.tril_indices, 0, False),
+        "UPPER_COL": (np.tril_indices, -1, True),
+        "LOWER_COL": (np.triu_indices, 1, True),
+        "UPPER_DIAG_COL": (np.tril_indices, 0, True),
+        "LOWER_DIAG_COL": (np.triu_indices, 0, True),
+    }
+    if weight_format not in layouts:
+        raise ValueError("Unsupported EDGE_WEIGHT_FORMAT: " + weight_format)
+    indices, offset, mirrored = layouts[weight_format]
+    rows, cols = indices(dimension, offset)
+    if mirrored:
+        return cols, rows
+    return rows, cols
+
+
+def is_number(token):
+    """ Whether a token from a .tsp file is numeric data rather than a keyword
+    """
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def parse_tsp(path, dense_limit=DENSE_LIMIT, dtype=np.float64):
+    """ Parses a standard TSPLIB .tsp/.atsp file
+
+    Coordinate instances (EUC_2D, CEIL_2D, GEO, ATT) are turned into distances with vectorised NumPy,
+    so startup depends on the number of cities and not on the number of edges.
+
+    Args:
+        path: File path for the TSPLIB file
+        dense_limit: Largest number of cities given a dense matrix. Defaults to DENSE_LIMIT.
+        dtype: Floating point type of the distances. Defaults to np.float64.
+
+    Returns:
+        adj_matrix: NumPy adjacency matrix, or CoordinateDistances computing rows on demand above dense_limit
+    """
+    with open(path) as file:
+        lines = file.read().splitlines()
+
+    spec = {}
+    coords = None
+    weights = None
+    index = 0
+    while index < len(lines):
+        line = lines[index].strip()
+        index += 1
+        if not line:
+            continue
+        keyword = line.split(":")[0].strip().upper()
+
+        if keyword == "EOF":
+            break
+        elif keyword == "NODE_COORD_SECTION":
+            dimension = int(spec["DIMENSION"])
+            values = np.array(" ".join(lines[index:index + dimension]).split(), dtype=np.float64)
+            # Each line is the city number followed by its coordinates
+            coords = values.reshape(dimension, -1)[:, 1:3]
+            index += dimension
+        elif keyword == "EDGE_WEIGHT_SECTION":
+            dimension = int(spec["DIMENSION"])
+            cells = explicit_indices(spec.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"), dimension)
+            count = dimension * dimension if cells is None else len(cells[0])
+            tokens = []
+            while len(tokens) < count:
+                tokens.extend(lines[index].split())
+                index += 1
+            weights = np.array(tokens[:count], dtype=np.float64)
+        elif keyword.endswith("_SECTION"):
+            # Display data, fixed edges and tours are not needed to build the graph
+            while index < len(lines) and (not lines[index].split() or is_number(lines[index].split()[0])):
+                index += 1
+        else:
+            key, _, value = line.partition(":")
+            spec[key.strip().upper()] = value.strip()
+
+    weight_type = spec.get("EDGE_WEIGHT_TYPE", "EXPLICIT")
+    if weight_type == "EXPLICIT":
+        if weights is None:
+            raise ValueError("EXPLICIT instance without EDGE_WEIGHT_SECTION: " + path)
+        if cells is None:
+            return weights.reshape(dimension, dimension).astype(dtype, copy=False)
+        adj_matrix = np.zeros(shape=(dimension, dimension), dtype=dtype)
+        # Triangular layouts describe symmetric instances
+        adj_matrix[cells[0], cells[1]] = weights
+        adj_matrix[cells[1], cells[0]] = weights
+        return adj_matrix
+
+    if weight_type not in METRICS:
+        raise ValueError("Unsupported EDGE_WEIGHT_TYPE: " + weight_type)
+    if coords is None:
+        raise ValueError(weight_type + " instance without NODE_COORD_SECTION: " + path)
+    if weight_type == "GEO":
+        coords = geo_radians(coords)
+
+    distances = CoordinateDistances(coords, METRICS[weight_type], dtype=dtype)
+    if len(distances) > dense_limit:
+        return distances
+    return np.array(distances)
+
+
+def load_graph(path, dtype=np.float64):
+    """ Loads a graph from either a TSPLIB XML export or a standard TSPLIB file, detected from its contents
+
+    Args:
+        path: File path for the graph
+        dtype: Floating point type of the distances. Defaults to np.float64.
+
+    Returns:
+        adj_matrix: NumPy adjacency matrix (or CoordinateDistances for very large coordinate instances)
+    """
+    with open(path, "rb") as file:
+        head = file.read(64).lstrip()
+    if head.startswith(b"<"):
+        return parse_xml(path, dtype=dtype)
+    return parse_tsp(path, dtype=dtype)
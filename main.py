@@ -4,8 +4,15 @@ from EAS_TSP import EAS_TSP
 from MMAS_TSP import MMAS_TSP
 import numpy as np
 import random
+import sys
 
 if __name__ == "__main__":
+    # Any arguments switch to the scriptable batch mode, see Batch.py --help
+    if len(sys.argv) > 1:
+        from Batch import main
+        main()
+        exit()
+    
     random.seed(1)
     np.random.seed(1)
     np.seterr(divide='ignore')